@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # /// script
 # dependencies = [
-#   "requests>=2.32,<3",
+#   "httpx[http2]>=0.27,<1",
 #   "PyYAML>=6,<7",
+#   "orjson>=3.9,<4",
 # ]
 # requires-python = ">=3.11"
 # ///
@@ -16,9 +17,44 @@ Security signals use two levels:
   CONFIRMED (💥 / 🚨): pattern is unambiguously dangerous
   UNVERIFIED (⚠️):     pattern matches but may be a false positive — needs human review
 
+Repositories are analyzed concurrently (ANALYZE_CONCURRENCY worker threads,
+default 8). All threads share one rate limiter so the combined request rate
+stays below GitHub's secondary rate limit, and one HTTP/2 client so their
+requests are multiplexed over a single connection to api.github.com.
+
+With --tarball, each repo is downloaded once as a tarball and all files are
+read locally instead of fetching the tree and each file through the API.
+This trades bandwidth for round-trips: one request per repo instead of up
+to 16, but large repos transfer their whole content.
+
+API responses are cached in ~/.cache/agent-skills/gh-cache.sqlite and
+revalidated with If-None-Match; GitHub does not count 304 Not Modified
+responses against the rate limit, so re-runs over unchanged repos are
+nearly free. Use --no-cache to bypass the cache. Within one run, a URL
+requested again is answered from memory without any request.
+
+Security scanning uses the linear-time RE2 engine when google-re2 is
+installed (uv run --with google-re2 ...) and the stdlib re module otherwise;
+both produce the same labels.
+
+Results are streamed to the output file one repo per line, in input
+order: a result is held in memory only until the repos before it have
+finished, and a crash keeps everything written so far.
+Each result is also recorded in a ledger (~/.cache/agent-skills/
+analyze-ledger.sqlite); repos whose updated_at has not changed since they
+were recorded, by a run with the same labeling rules, are taken from the
+ledger without any API calls; their repos.json fields are still the
+current ones. The ledger
+also keeps scan and validation results per git blob SHA, so a script or
+SKILL.md already seen in any repo is neither downloaded nor scanned again.
+Use --fresh to clear the ledger and re-analyze everything.
+
 Usage:
   scripts/analyze-repos.py --repos repos.json --output labeled.json
   scripts/analyze-repos.py --repos repos.json --output labeled.json --limit 50
+  scripts/analyze-repos.py --repos repos.json --output labeled.json --tarball
+  scripts/analyze-repos.py --repos repos.json --output labeled.json --fresh
+  ANALYZE_CONCURRENCY=16 scripts/analyze-repos.py --repos repos.json
 
 Exit codes:
   0  Success
@@ -27,20 +63,47 @@ Exit codes:
 """
 
 import argparse
+import functools
+import hashlib
 import json
 import os
 import re
+import sqlite3
 import sys
+import tarfile
+import tempfile
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from pathlib import Path
 
 try:
-    import requests
+    import httpx
     import yaml
 except ImportError:
     print("Error: Run with: uv run scripts/analyze-repos.py", file=sys.stderr)
     sys.exit(2)
 
+# Optional: orjson serializes several times faster than the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Prefer the libyaml-backed C loader (bundled with PyYAML wheels)
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Optional: RE2 matches in guaranteed linear time (no backtracking)
+try:
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
 
 # ── Security signal patterns ────────────────────────────────────────────────
 #
@@ -64,84 +127,452 @@ except ImportError:
 #   rm -rf ./build
 #   rm -rf node_modules
 #   rm -rf $TMPDIR/specific-subpath  (explicit subpath after variable)
+#
+# All patterns must match in linear time with the stdlib re engine too:
+#   - The rm flags are written so each letter can be consumed in only one
+#     way. The naive [a-zA-Z]*rf[a-zA-Z]* backtracks quadratically on a
+#     long "-rfrfrf..." run.
+#   - A gap between two keywords (curl ... $GITHUB_TOKEN) is bounded to
+#     SCAN_WINDOW characters. An unbounded .* is rescanned to the end of the
+#     line from every "curl", which is quadratic on a long line of them.
+# Every pattern is also valid RE2 syntax (no lookarounds, repeats <= 1000).
+SCAN_WINDOW = 256
+
+# Flag letters containing "rf" (IGNORECASE makes these ranges cover A-Z)
+_RF_FLAGS = r'-(?:[a-qs-z]|r+[a-eg-qs-z])*r+f[a-z]*'
+_GAP = f'.{{0,{SCAN_WINDOW}}}'
+_NO_PIPE_GAP = f'[^|]{{0,{SCAN_WINDOW}}}'
 
 RM_RF_CONFIRMED = [
     # rm -rf / or rm -rf /* (root)
-    re.compile(r'rm\s+-[a-zA-Z]*rf[a-zA-Z]*\s+/\*?(?:\s|$)', re.IGNORECASE),
+    re.compile(rf'rm\s+{_RF_FLAGS}\s+/\*?(?:\s|$)', re.IGNORECASE),
     # rm -rf ~ or rm -rf ~/
-    re.compile(r'rm\s+-[a-zA-Z]*rf[a-zA-Z]*\s+~/?(?:\s|$)', re.IGNORECASE),
+    re.compile(rf'rm\s+{_RF_FLAGS}\s+~/?(?:\s|$)', re.IGNORECASE),
     # rm -rf * (bare wildcard, not ./*)
-    re.compile(r'rm\s+-[a-zA-Z]*rf[a-zA-Z]*\s+\*(?:\s|$)', re.IGNORECASE),
+    re.compile(rf'rm\s+{_RF_FLAGS}\s+\*(?:\s|$)', re.IGNORECASE),
 ]
 
 RM_RF_UNVERIFIED = [
     # rm -rf $VAR or rm -rf ${VAR} where the variable is at end of line
     # (no further path component after the variable)
-    re.compile(r'rm\s+-[a-zA-Z]*rf[a-zA-Z]*\s+\$\{?\w+\}?\s*(?:#.*)?$', re.IGNORECASE | re.MULTILINE),
+    re.compile(rf'rm\s+{_RF_FLAGS}\s+\$\{{?\w+\}}?\s*(?:#.*)?$', re.IGNORECASE | re.MULTILINE),
 ]
 
 # ENV exfiltration CONFIRMED — clearly piping env to remote
 ENV_EXFIL_CONFIRMED = [
-    re.compile(r'(env|printenv|set)\s*\|.*curl', re.IGNORECASE),
-    re.compile(r'curl[^|]*\$\{?GITHUB_TOKEN[^|]*\|\s*nc\b', re.IGNORECASE),
+    re.compile(rf'(env|printenv|set)\s*\|{_GAP}curl', re.IGNORECASE),
+    re.compile(rf'curl{_NO_PIPE_GAP}\$\{{?GITHUB_TOKEN{_NO_PIPE_GAP}\|\s*nc\b', re.IGNORECASE),
 ]
 
 # ENV exfiltration UNVERIFIED — sending a secret via curl (common in CI but worth noting)
 ENV_EXFIL_UNVERIFIED = [
-    re.compile(r'curl.*\$\{?GITHUB_TOKEN', re.IGNORECASE),
-    re.compile(r'curl.*\$\{?secrets\.', re.IGNORECASE),
-    re.compile(r'wget.*\$(HOME|USER|PATH)\b', re.IGNORECASE),
+    re.compile(rf'curl{_GAP}\$\{{?GITHUB_TOKEN', re.IGNORECASE),
+    re.compile(rf'curl{_GAP}\$\{{?secrets\.', re.IGNORECASE),
+    re.compile(rf'wget{_GAP}\$(HOME|USER|PATH)\b', re.IGNORECASE),
 ]
 
-SKILL_RELEVANT_KEYWORDS = {
-    "skill", "agent", "claude", "llm", "ai agent", "coding agent",
-    "SKILL.md", "agentskills", "assistant", "copilot",
+
+def _union(patterns: dict[str, re.Pattern]):
+    """Combine patterns into one alternation with a named group per pattern."""
+    # Flags are inline so the same pattern string works with re and re2
+    return regex_engine.compile(
+        "(?im)" + "|".join(f"(?P<{group}>{p.pattern})" for group, p in patterns.items())
+    )
+
+
+# Patterns per severity, by group name. The prefix of each group name
+# tells which signal it belongs to.
+CONFIRMED_PATTERNS = {
+    "rmrf_root": RM_RF_CONFIRMED[0],
+    "rmrf_home": RM_RF_CONFIRMED[1],
+    "rmrf_glob": RM_RF_CONFIRMED[2],
+    "env_pipe": ENV_EXFIL_CONFIRMED[0],
+    "env_nc": ENV_EXFIL_CONFIRMED[1],
+}
+UNVERIFIED_PATTERNS = {
+    "rmrf_var": RM_RF_UNVERIFIED[0],
+    "env_token": ENV_EXFIL_UNVERIFIED[0],
+    "env_secrets": ENV_EXFIL_UNVERIFIED[1],
+    "env_wget": ENV_EXFIL_UNVERIFIED[2],
 }
+UNION_GROUP_SIGNALS = {
+    group: "rm-rf" if group.startswith("rmrf_") else "env-stealer"
+    for group in [*CONFIRMED_PATTERNS, *UNVERIFIED_PATTERNS]
+}
+SIGNAL_KINDS = frozenset({"rm-rf", "env-stealer"})
+
+
+def _unions(patterns: dict[str, re.Pattern]) -> dict[frozenset[str], re.Pattern]:
+    """
+    One union per set of signals still to be found. Once a signal has
+    matched, the rest of the file is searched with a union that no longer
+    contains its patterns, so each file is scanned at most twice per severity.
+    """
+    return {
+        kinds: _union({g: p for g, p in patterns.items() if UNION_GROUP_SIGNALS[g] in kinds})
+        for kinds in (SIGNAL_KINDS, *(frozenset({kind}) for kind in SIGNAL_KINDS))
+    }
+
+
+CONFIRMED_UNIONS = _unions(CONFIRMED_PATTERNS)
+UNVERIFIED_UNIONS = _unions(UNVERIFIED_PATTERNS)
+
+# Tree path checks: scripts anywhere under a scripts/ dir, and the
+# resource directories that earn the has-scripts / has-references labels
+SCRIPT_PATH_RE = re.compile(r'(?:^|/)scripts/.*\.(?:py|sh|bash)$')
+RESOURCE_DIRS_RE = re.compile(r'(?:^|(?<=/))(scripts|references)/')
+LICENSE_NAMES = frozenset({"license", "license.txt", "license.md"})
+
+# agentskills.io name: lowercase alphanumerics and hyphens, no leading/trailing hyphen
+NAME_RE = re.compile(r'^[a-z0-9](?:[a-z0-9-]*[a-z0-9])?$')
+NAME_MAX_CHARS = 64
+DESCRIPTION_MAX_CHARS = 1024
+
+SKILL_RELEVANT_KEYWORDS = frozenset({
+    "skill", "agent", "claude", "llm", "ai agent", "coding agent",
+    "skill.md", "agentskills", "assistant", "copilot",
+})
 
 SKILL_LANGUAGES = {"Python", "Shell", "TypeScript", "JavaScript"}
 
 
+def _keywords(words) -> re.Pattern:
+    """One alternation matching any of the literal words (case-insensitive)."""
+    return regex_engine.compile("(?i)" + "|".join(re.escape(w) for w in words))
+
+
+# Keyword groups for repos without a SKILL.md, each matched in a single pass
+# over the text. Checked in order; the first matching group wins.
+CATEGORY_KEYWORDS = (
+    ("skill-manager", _keywords(["marketplace", "package manager", "registry", "paks", "skillport"])),
+    ("skill-integration", _keywords(["integrate", "integration", "mcp", "extension", "cli", "server"])),
+    ("awesome-list", _keywords(["awesome", "curated", "collection", "list"])),
+    ("framework", _keywords(["framework", "sdk", "library"])),
+    ("example", _keywords(["example", "demo", "tutorial", "sample"])),
+)
+SKILL_RELEVANT_RE = _keywords(SKILL_RELEVANT_KEYWORDS)
+SKILL_RELEVANT_TOPICS_RE = _keywords(["skill", "agent", "claude", "llm"])
+
+# Concurrency: repos analyzed in parallel, and file fetches in parallel per repo
+DEFAULT_CONCURRENCY = 8
+FILE_FETCH_WORKERS = 4
+
+# Shared request budget across all threads. 5000 req/hr is the hourly quota,
+# but the binding short-term limit is GitHub's secondary rate limit
+# (900 points/min for GET requests), so stay well below 15 req/s.
+REQUESTS_PER_SECOND = 10
+
+# Tarballs are spooled in memory up to this size, then to a temp file
+TARBALL_SPOOL_BYTES = 16 * 1024 * 1024
+
+CACHE_PATH = Path.home() / ".cache" / "agent-skills" / "gh-cache.sqlite"
+LEDGER_PATH = Path.home() / ".cache" / "agent-skills" / "analyze-ledger.sqlite"
+LEDGER_COMMIT_EVERY = 20
+
+# Response bodies kept in memory for the current run (characters in total)
+MEMO_MAX_CHARS = 8 * 1024 * 1024
+
+# Check results per (kind, git blob SHA), shared by all threads and
+# persisted in the ledger. kind is "skill-md" (validation errors) or
+# "script" (security signals).
+BLOB_RESULTS: dict[tuple[str, str], list[str]] = {}
+
+# A repo with no commits for this long gets the "stale" label
+STALE_AFTER_DAYS = 180
+
+# Bump when the labeling code changes in a way labels_digest() cannot see,
+# so that results recorded in the ledger by older versions are not reused
+LABEL_RULES_VERSION = 1
+
+
+class RateLimiter:
+    """Token bucket shared by all worker threads."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve a token even if it is not there yet; callers queue up
+            # behind each other by sleeping for their share of the deficit.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+RATE_LIMITER = RateLimiter(REQUESTS_PER_SECOND, burst=DEFAULT_CONCURRENCY)
+
+
+class ResponseCache:
+    """On-disk store of (etag, body) per URL, shared by all worker threads."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, etag TEXT, body TEXT)")
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> tuple[str, str] | None:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, body FROM responses WHERE url = ?", (url,)).fetchone()
+
+    def put(self, url: str, etag: str, body: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, body) VALUES (?, ?, ?)",
+                (url, etag, body))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# Set in main() unless --no-cache is given
+RESPONSE_CACHE: ResponseCache | None = None
+
+
+class BodyMemo:
+    """
+    In-process LRU of successful response bodies, shared by all worker
+    threads and bounded by their total size. A URL requested again in the
+    same run (a repo listed twice, a retried repo) costs no request at all,
+    not even a 304 revalidation. Failures raise and are never stored.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._bodies: OrderedDict[str, str] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: str) -> None:
+        # One huge tree must not evict everything else
+        if len(body) > self.max_chars // 8:
+            return
+        with self._lock:
+            old = self._bodies.pop(key, None)
+            if old is not None:
+                self._chars -= len(old)
+            self._bodies[key] = body
+            self._chars += len(body)
+            while self._chars > self.max_chars:
+                _, evicted = self._bodies.popitem(last=False)
+                self._chars -= len(evicted)
+
+
+BODY_MEMO = BodyMemo(MEMO_MAX_CHARS)
+
+# One client for all threads: httpx.Client is thread-safe, and with HTTP/2
+# concurrent requests share one TLS connection as multiplexed streams.
+# The transport retries failed connection attempts; HTTP-level retries
+# (5xx, rate limits) are handled in github_request.
+HTTP_CLIENT = httpx.Client(
+    timeout=20,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    ),
+)
+
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+# Statuses that mean the resource does not exist: 409 is an empty repo's tree
+ABSENT_STATUSES = frozenset({404, 409})
+
+# Contents API media type that returns the file body as-is, without base64
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+
+class FetchError(Exception):
+    """A GitHub request failed for a reason other than the resource being absent."""
+
+
+def rate_limit_wait(resp: httpx.Response) -> float:
+    """Seconds to wait before retrying a 403/429, per GitHub's rate limit headers."""
+    retry_after = resp.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return int(retry_after)
+    reset = resp.headers.get("X-RateLimit-Reset", "")
+    if resp.headers.get("X-RateLimit-Remaining") == "0" and reset.isdigit():
+        return max(0.0, int(reset) - time.time()) + 1
+    return 60
+
+
+def dump_json_line(obj) -> bytes:
+    """Serialize obj as compact UTF-8 JSON (orjson when available)."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
 def github_get(url: str, headers: dict, retries: int = 3) -> dict | None:
+    body = github_get_text(url, headers, retries)
+    return json.loads(body) if body is not None else None
+
+
+def github_get_raw(url: str, headers: dict, retries: int = 3) -> str | None:
+    """Fetch a contents API URL as the raw file body instead of base64 JSON."""
+    return github_get_text(url, {**headers, "Accept": RAW_MEDIA_TYPE}, retries)
+
+
+def github_request(url: str, headers: dict, retries: int = 3, *, stream: bool = False,
+                   timeout: float | None = None, follow_redirects: bool = False) -> httpx.Response | None:
+    """
+    GET url through the shared rate limiter, retrying network errors and 5xx
+    with backoff and waiting out 403/429 rate limits. Returns the 200 (or
+    304) response, or None if the resource does not exist. Raises
+    FetchError once the retries are used up or on any other error status,
+    so that a failed request is never mistaken for a missing file.
+    A streamed response must be closed by the caller.
+    """
+    request = HTTP_CLIENT.build_request("GET", url, headers=headers,
+                                        timeout=timeout or HTTP_CLIENT.timeout)
     for attempt in range(retries):
+        RATE_LIMITER.acquire()
         try:
-            resp = requests.get(url, headers=headers, timeout=20)
-        except requests.RequestException as e:
+            resp = HTTP_CLIENT.send(request, stream=stream, follow_redirects=follow_redirects)
+        except httpx.RequestError as e:
             print(f"  Network error ({url}): {e}", file=sys.stderr)
             time.sleep(2 ** attempt)
             continue
 
-        if resp.status_code == 404:
+        if resp.status_code in (200, 304):
+            return resp
+        resp.close()
+        if resp.status_code in ABSENT_STATUSES:
             return None
-        if resp.status_code == 403:
-            print(f"  Rate limited. Waiting 60s...", file=sys.stderr)
-            time.sleep(60)
+        if resp.status_code in (403, 429):
+            wait = rate_limit_wait(resp)
+            print(f"  Rate limited. Waiting {wait:.0f}s...", file=sys.stderr)
+            time.sleep(wait)
             continue
-        if resp.status_code != 200:
-            print(f"  HTTP {resp.status_code} for {url}", file=sys.stderr)
-            return None
+        if resp.status_code in RETRY_STATUSES:
+            print(f"  HTTP {resp.status_code} for {url}, retrying...", file=sys.stderr)
+            time.sleep(2 ** attempt)
+            continue
+        raise FetchError(f"HTTP {resp.status_code} for {url}")
+    raise FetchError(f"no response for {url} after {retries} attempts")
+
+
+def github_get_text(url: str, headers: dict, retries: int = 3) -> str | None:
+    """Body of url, or None if it does not exist (see github_request)."""
+    # The same URL has a different body per media type, so key the cache on both
+    cache_key = f"{headers.get('Accept', '')} {url}"
+    body = BODY_MEMO.get(cache_key)
+    if body is not None:
+        return body
+    cached = RESPONSE_CACHE.get(cache_key) if RESPONSE_CACHE else None
+    if cached:
+        headers = {**headers, "If-None-Match": cached[0]}
+
+    resp = github_request(url, headers, retries)
+    if resp is None:
+        return None
+    if resp.status_code == 304:
+        if not cached:
+            raise FetchError(f"HTTP 304 for {url} without a cached copy")
+        BODY_MEMO.put(cache_key, cached[1])
+        return cached[1]
 
-        return resp.json()
-    return None
+    etag = resp.headers.get("ETag")
+    if RESPONSE_CACHE and etag:
+        RESPONSE_CACHE.put(cache_key, etag, resp.text)
+    BODY_MEMO.put(cache_key, resp.text)
+    return resp.text
 
 
-def get_file_tree(owner: str, name: str, branch: str, headers: dict) -> list[str]:
+def get_file_tree(owner: str, name: str, branch: str, headers: dict) -> dict[str, str | None]:
+    """Map each file path in the repo to its git blob SHA."""
     url = f"https://api.github.com/repos/{owner}/{name}/git/trees/{branch}?recursive=1"
     data = github_get(url, headers)
     if not data:
-        return []
-    return [item["path"] for item in data.get("tree", []) if item.get("type") == "blob"]
+        return {}
+    return {item["path"]: item.get("sha") for item in data.get("tree", []) if item.get("type") == "blob"}
 
 
 def get_file_content(owner: str, name: str, path: str, headers: dict) -> str | None:
-    import base64
+    # Undecodable bytes are replaced: httpx decodes the body as UTF-8 by default
     url = f"https://api.github.com/repos/{owner}/{name}/contents/{path}"
-    data = github_get(url, headers)
-    if not data or data.get("encoding") != "base64":
+    return github_get_raw(url, headers)
+
+
+def fetch_repo_tarball(owner: str, name: str, branch: str, headers: dict):
+    """Download the repo tarball into a spooled temp file (None if there is none)."""
+    url = f"https://api.github.com/repos/{owner}/{name}/tarball/{branch}"
+    # The API redirects to codeload.github.com; httpx drops the
+    # Authorization header on the cross-origin hop.
+    resp = github_request(url, headers, stream=True, timeout=60, follow_redirects=True)
+    if resp is None:
         return None
+    spool = tempfile.SpooledTemporaryFile(max_size=TARBALL_SPOOL_BYTES)
     try:
-        return base64.b64decode(data["content"]).decode("utf-8", errors="replace")
-    except Exception:
-        return None
+        for chunk in resp.iter_bytes(chunk_size=65536):
+            spool.write(chunk)
+    except httpx.RequestError as e:
+        spool.close()
+        raise FetchError(f"network error reading {url}: {e}") from e
+    finally:
+        resp.close()
+    spool.seek(0)
+    return spool
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The SHA git (and the tree API) assigns to a file with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def read_tarball(fileobj) -> tuple[dict[str, str | None], dict[str, str]]:
+    """
+    Read a repo tarball in one streaming pass.
+
+    Returns (tree, contents): all file paths relative to the repo root, with
+    the blob SHA of each SKILL.md and script file (None for others), and
+    the decoded content of every SKILL.md and script file.
+    """
+    tree = {}
+    contents = {}
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            # Strip the "{owner}-{repo}-{sha}/" prefix GitHub adds
+            path = member.name.split("/", 1)[-1]
+            tree[path] = None
+            if path.endswith("SKILL.md") or SCRIPT_PATH_RE.search(path):
+                f = tar.extractfile(member)
+                if f:
+                    data = f.read()
+                    tree[path] = git_blob_sha(data)
+                    contents[path] = data.decode("utf-8", errors="replace")
+    return tree, contents
+
+
+def scan_tree_dirs(tree: dict[str, str | None]) -> tuple[bool, bool]:
+    """Return (has_scripts, has_references) from a single pass over the tree."""
+    found = set()
+    for p in tree:
+        found.update(RESOURCE_DIRS_RE.findall(p))
+        if len(found) == 2:
+            break
+    return "scripts" in found, "references" in found
 
 
 def parse_skill_md_frontmatter(content: str) -> dict | None:
@@ -151,7 +582,7 @@ def parse_skill_md_frontmatter(content: str) -> dict | None:
     if end == -1:
         return None
     try:
-        return yaml.safe_load(content[3:end]) or {}
+        return yaml.load(content[3:end], Loader=SafeLoader) or {}
     except yaml.YAMLError:
         return None
 
@@ -162,22 +593,34 @@ def validate_frontmatter(fm: dict) -> list[str]:
     name = fm.get("name", "")
     if not name:
         errors.append("missing name")
-    elif not re.match(r'^[a-z0-9][a-z0-9-]*[a-z0-9]$|^[a-z0-9]$', name):
+    elif not NAME_RE.match(name):
         errors.append(f"invalid name: {name!r}")
     elif "--" in name:
         errors.append(f"consecutive hyphens in name: {name!r}")
-    elif len(name) > 64:
-        errors.append("name exceeds 64 chars")
+    elif len(name) > NAME_MAX_CHARS:
+        errors.append(f"name exceeds {NAME_MAX_CHARS} chars")
 
     desc = fm.get("description", "")
     if not desc:
         errors.append("missing description")
-    elif len(str(desc)) > 1024:
-        errors.append("description exceeds 1024 chars")
+    elif len(str(desc)) > DESCRIPTION_MAX_CHARS:
+        errors.append(f"description exceeds {DESCRIPTION_MAX_CHARS} chars")
 
     return errors
 
 
+def _matched_signals(unions: dict[frozenset[str], re.Pattern], content: str,
+                     wanted: frozenset[str]) -> set[str]:
+    """Signals in wanted that content matches, searching only for those not yet found."""
+    found = set()
+    while remaining := wanted - found:
+        m = unions[remaining].search(content)
+        if not m:
+            break
+        found.add(UNION_GROUP_SIGNALS[m.lastgroup])
+    return found
+
+
 def scan_for_security_signals(content: str) -> list[str]:
     """
     Returns list of signal label strings.
@@ -185,64 +628,50 @@ def scan_for_security_signals(content: str) -> list[str]:
     Unverified/suspicious patterns → 'rm-rf?' or 'env-stealer?'
     A confirmed signal supersedes the unverified one for the same type.
     """
-    signals = []
-
-    # Check rm-rf confirmed first
-    rm_confirmed = any(p.search(content) for p in RM_RF_CONFIRMED)
-    if rm_confirmed:
-        signals.append("rm-rf")
-    else:
-        rm_unverified = any(p.search(content) for p in RM_RF_UNVERIFIED)
-        if rm_unverified:
-            signals.append("rm-rf?")
-
-    # Check env-stealer confirmed first
-    env_confirmed = any(p.search(content) for p in ENV_EXFIL_CONFIRMED)
-    if env_confirmed:
-        signals.append("env-stealer")
-    else:
-        env_unverified = any(p.search(content) for p in ENV_EXFIL_UNVERIFIED)
-        if env_unverified:
-            signals.append("env-stealer?")
+    confirmed = _matched_signals(CONFIRMED_UNIONS, content, SIGNAL_KINDS)
+    unverified = _matched_signals(UNVERIFIED_UNIONS, content, SIGNAL_KINDS - confirmed)
 
+    signals = []
+    for kind in ("rm-rf", "env-stealer"):
+        if kind in confirmed:
+            signals.append(kind)
+        elif kind in unverified:
+            signals.append(f"{kind}?")
     return signals
 
 
-def is_misleading(repo: dict, has_skill_md: bool) -> bool:
-    if has_skill_md:
-        return False
-    desc = (repo.get("description") or "").lower()
-    name = repo.get("name", "").lower()
-    topics = [t.lower() for t in repo.get("topics", [])]
-    lang = repo.get("language")
-
-    desc_relevant = any(kw.lower() in desc for kw in SKILL_RELEVANT_KEYWORDS)
-    topics_relevant = any(
-        kw.lower() in " ".join(topics)
-        for kw in {"skill", "agent", "claude", "llm"}
-    )
+def is_misleading(desc_l: str, topics_join: str, lang: str | None) -> bool:
+    """True for a repo without SKILL.md that shows no sign of being skill-related.
+
+    desc_l and topics_join are the lowercased description and space-joined topics.
+    """
+    desc_relevant = SKILL_RELEVANT_RE.search(desc_l) is not None
+    topics_relevant = SKILL_RELEVANT_TOPICS_RE.search(topics_join) is not None
     lang_relevant = lang in SKILL_LANGUAGES
 
     return not desc_relevant and not topics_relevant and not lang_relevant
 
 
-def classify_repo(repo: dict, tree: list[str], skill_mds: list[str], security_signals: list[str]) -> dict:
+def is_stale(updated_at: str | None, now: datetime) -> bool:
+    """True if the repo has had no commits in 6 months."""
+    if not updated_at:
+        return False
+    try:
+        updated = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    return (now - updated).days > STALE_AFTER_DAYS
+
+
+def classify_repo(repo: dict, tree: dict[str, str | None], skill_mds: list[str], security_signals: list[str],
+                  dir_flags: tuple[bool, bool], now: datetime) -> dict:
     has_skill_md = len(skill_mds) > 0
-    has_scripts = any(p.startswith("scripts/") or "/scripts/" in p for p in tree)
-    has_references = any(p.startswith("references/") or "/references/" in p for p in tree)
-    has_license = any(p.lower() in ("license", "license.txt", "license.md") for p in tree)
+    has_scripts, has_references = dir_flags
+    has_license = any(p.lower() in LICENSE_NAMES for p in tree)
     archived = repo.get("archived", False)
 
-    # Staleness: no commits in 6 months
-    stale = False
-    updated_at = repo.get("updated_at")
-    if updated_at:
-        try:
-            updated = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
-            age_days = (datetime.now(timezone.utc) - updated).days
-            stale = age_days > 180
-        except ValueError:
-            pass
+    stale = is_stale(repo.get("updated_at"), now)
+    topics = repo.get("topics", [])
 
     # Primary category
     if has_skill_md:
@@ -251,24 +680,16 @@ def classify_repo(repo: dict, tree: list[str], skill_mds: list[str], security_si
         else:
             primary = "skill"
     else:
-        desc = (repo.get("description") or "").lower()
-        name = repo.get("name", "").lower()
-        all_text = desc + " " + name + " " + " ".join(repo.get("topics", []))
-        if any(kw in all_text for kw in ["marketplace", "package manager", "registry", "paks", "skillport"]):
-            primary = "skill-manager"
-        elif any(kw in all_text for kw in ["integrate", "integration", "mcp", "extension", "cli", "server"]):
-            primary = "skill-integration"
-        elif any(kw in all_text for kw in ["awesome", "curated", "collection", "list"]):
-            primary = "awesome-list"
-        elif any(kw in all_text for kw in ["framework", "sdk", "library"]):
-            primary = "framework"
-        elif any(kw in all_text for kw in ["example", "demo", "tutorial", "sample"]):
-            primary = "example"
-        elif is_misleading(repo, has_skill_md):
-            primary = "other"
-            security_signals = list(set(security_signals + ["misleading"]))
-        else:
+        desc_l = (repo.get("description") or "").lower()
+        name_l = repo.get("name", "").lower()
+        topics_join = " ".join(topics).lower()
+        all_text = f"{desc_l} {name_l} {topics_join}"
+        primary = next(
+            (label for label, keywords in CATEGORY_KEYWORDS if keywords.search(all_text)), None)
+        if primary is None:
             primary = "other"
+            if is_misleading(desc_l, topics_join, repo.get("language")):
+                security_signals = list(set(security_signals + ["misleading"]))
 
     # Signal labels
     signals = list(security_signals)
@@ -285,7 +706,6 @@ def classify_repo(repo: dict, tree: list[str], skill_mds: list[str], security_si
     if not has_license:
         signals.append("no-license")
 
-    topics = repo.get("topics", [])
     if any(t in topics for t in ["multi-agent", "claude-code", "copilot", "gemini-cli", "codex"]):
         signals.append("multi-agent")
 
@@ -297,42 +717,66 @@ def classify_repo(repo: dict, tree: list[str], skill_mds: list[str], security_si
     }
 
 
-def analyze_repo(repo: dict, headers: dict) -> dict:
+def skill_md_errors(content: str) -> list[str]:
+    fm = parse_skill_md_frontmatter(content)
+    return validate_frontmatter(fm) if fm else []
+
+
+def check_blob(kind: str, check, sha: str | None, get_content, path: str) -> list[str]:
+    """
+    Run check on the file at path, reusing the result recorded for its blob SHA.
+
+    On a hit the file is not even fetched. A file that turns out not to
+    exist yields no result and none is recorded; a failed fetch raises.
+    """
+    key = (kind, sha)
+    if sha and key in BLOB_RESULTS:
+        return BLOB_RESULTS[key]
+    content = get_content(path)
+    if not content:
+        return []
+    result = check(content)
+    if sha:
+        BLOB_RESULTS[key] = result
+    return result
+
+
+def analyze_repo(repo: dict, headers: dict, now: datetime, use_tarball: bool = False) -> dict:
     owner = repo["owner"]
     name = repo["name"]
     branch = repo.get("default_branch", "main")
 
     print(f"  Analyzing {owner}/{name}...", file=sys.stderr)
 
-    tree = get_file_tree(owner, name, branch, headers)
-    time.sleep(0.5)  # gentle rate limiting
+    if use_tarball:
+        tree, files = {}, {}
+        tarball = fetch_repo_tarball(owner, name, branch, headers)
+        if tarball:
+            with tarball:
+                tree, files = read_tarball(tarball)
+        get_content = files.get
+    else:
+        tree = get_file_tree(owner, name, branch, headers)
+        get_content = functools.partial(get_file_content, owner, name, headers=headers)
 
     skill_md_paths = [p for p in tree if p.endswith("SKILL.md")]
-    security_signals = []
-    validation_errors = []
-
-    # Analyze SKILL.md files
-    for skill_path in skill_md_paths[:5]:
-        content = get_file_content(owner, name, skill_path, headers)
-        if content:
-            fm = parse_skill_md_frontmatter(content)
-            if fm:
-                errs = validate_frontmatter(fm)
-                validation_errors.extend(errs)
-        time.sleep(0.3)
-
-    # Scan scripts for security signals
-    script_paths = [p for p in tree if
-                    (p.startswith("scripts/") or "/scripts/" in p) and
-                    (p.endswith(".py") or p.endswith(".sh") or p.endswith(".bash"))]
-    for script_path in script_paths[:10]:
-        content = get_file_content(owner, name, script_path, headers)
-        if content:
-            sigs = scan_for_security_signals(content)
-            security_signals.extend(sigs)
-        time.sleep(0.2)
-
-    classification = classify_repo(repo, tree, skill_md_paths, list(set(security_signals)))
+    script_paths = [p for p in tree if SCRIPT_PATH_RE.search(p)]
+
+    def validate(path: str) -> list[str]:
+        return check_blob("skill-md", skill_md_errors, tree[path], get_content, path)
+
+    def scan(path: str) -> list[str]:
+        return check_blob("script", scan_for_security_signals, tree[path], get_content, path)
+
+    # Validate SKILL.md files and scan scripts for security signals, fetching
+    # in parallel (tarball contents are local)
+    with ThreadPoolExecutor(max_workers=FILE_FETCH_WORKERS) as pool:
+        fetch_all = map if use_tarball else pool.map
+        validation_errors = [e for errs in fetch_all(validate, skill_md_paths[:5]) for e in errs]
+        security_signals = [s for sigs in fetch_all(scan, script_paths[:10]) for s in sigs]
+
+    classification = classify_repo(repo, tree, skill_md_paths, list(set(security_signals)),
+                                   scan_tree_dirs(tree), now)
 
     # Downgrade spec-compliant if validation errors found
     if validation_errors and "spec-compliant" in classification["signal_labels"]:
@@ -344,10 +788,61 @@ def analyze_repo(repo: dict, headers: dict) -> dict:
         **classification,
         "validation_errors": validation_errors,
         "file_count": len(tree),
-        "analyzed_at": datetime.now(timezone.utc).isoformat(),
+        "analyzed_at": now.isoformat(),
     }
 
 
+def open_ledger(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(labeled)")}
+    if columns and "rules" not in columns:
+        # Recorded before results were tied to the rules that produced them
+        conn.execute("DROP TABLE labeled")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS labeled (full_name TEXT PRIMARY KEY, updated_at TEXT,"
+        " rules TEXT, json TEXT)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS blobs (kind TEXT, sha TEXT, rules TEXT, result TEXT,"
+        " PRIMARY KEY (kind, sha))")
+    return conn
+
+
+def _digest(parts) -> str:
+    return hashlib.sha1("\n".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+
+def rules_digest() -> str:
+    """Fingerprint of the scan and validation rules, so recorded blob results
+    are discarded when the patterns or limits change."""
+    return _digest([CONFIRMED_UNIONS[SIGNAL_KINDS].pattern, UNVERIFIED_UNIONS[SIGNAL_KINDS].pattern,
+                    NAME_RE.pattern, NAME_MAX_CHARS, DESCRIPTION_MAX_CHARS])
+
+
+def labels_digest(blob_rules: str) -> str:
+    """Fingerprint of everything that decides a repo's labels, so recorded
+    repo results are discarded when any rule or keyword table changes."""
+    # Sorted: the order of a frozenset of strings differs between processes
+    return _digest([
+        blob_rules, LABEL_RULES_VERSION, SCRIPT_PATH_RE.pattern, RESOURCE_DIRS_RE.pattern,
+        sorted(LICENSE_NAMES), sorted(SKILL_RELEVANT_KEYWORDS), sorted(SKILL_LANGUAGES),
+        SKILL_RELEVANT_TOPICS_RE.pattern,
+        *(f"{label} {keywords.pattern}" for label, keywords in CATEGORY_KEYWORDS),
+    ])
+
+
+def from_ledger(result: dict, now: datetime) -> dict:
+    """
+    Reuse a recorded result, re-deriving the time-dependent "stale" label.
+    The caller overlays the current repos.json record, so stars, description
+    and the other input fields are never the ones from the recording run.
+    """
+    signals = [s for s in result.get("signal_labels", []) if s != "stale"]
+    if is_stale(result.get("updated_at"), now):
+        signals.append("stale")
+    return {**result, "signal_labels": sorted(signals)}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description=__doc__,
@@ -359,10 +854,20 @@ def main() -> int:
                         help="Output labeled JSON file (default: labeled.json)")
     parser.add_argument("--limit", type=int, default=0,
                         help="Process only first N repos (0 = all, default: 0)")
+    parser.add_argument("--tarball", action="store_true",
+                        help="Download each repo as one tarball instead of per-file API calls")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Do not read or write the response cache ({CACHE_PATH})")
+    parser.add_argument("--fresh", action="store_true",
+                        help=f"Clear the ledger of analyzed repos ({LEDGER_PATH}) and re-analyze all")
     args = parser.parse_args()
 
-    with open(args.repos, encoding="utf-8") as f:
-        data = json.load(f)
+    global RESPONSE_CACHE
+    if not args.no_cache:
+        RESPONSE_CACHE = ResponseCache(CACHE_PATH)
+
+    with open(args.repos, "rb") as f:
+        data = orjson.loads(f.read()) if orjson else json.load(f)
 
     repos = data["repos"]
     if args.limit > 0:
@@ -378,28 +883,97 @@ def main() -> int:
     else:
         print("Warning: GITHUB_TOKEN not set. May hit rate limits.", file=sys.stderr)
 
-    labeled = []
-    for i, repo in enumerate(repos, 1):
-        print(f"[{i}/{len(repos)}] {repo['full_name']}", file=sys.stderr)
-        try:
-            result = analyze_repo(repo, headers)
-            labeled.append(result)
-        except Exception as e:
-            print(f"  Error analyzing {repo['full_name']}: {e}", file=sys.stderr)
-            labeled.append({**repo, "primary_label": "other", "signal_labels": ["error"], "error": str(e)})
-
-    output = {
-        "tag": data.get("tag"),
-        "analyzed_at": datetime.now(timezone.utc).isoformat(),
-        "total": len(labeled),
-        "repos": labeled,
-    }
-
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
-
-    print(f"\nWrote {len(labeled)} labeled repos to {args.output}", file=sys.stderr)
-    print(json.dumps({"output": args.output, "count": len(labeled)}))
+    concurrency = int(os.environ.get("ANALYZE_CONCURRENCY", DEFAULT_CONCURRENCY))
+
+    ledger = open_ledger(LEDGER_PATH)
+    if args.fresh:
+        ledger.execute("DELETE FROM labeled")
+        ledger.execute("DELETE FROM blobs")
+        ledger.commit()
+    rules = rules_digest()
+    label_rules = labels_digest(rules)
+    for kind, sha, result_json in ledger.execute(
+            "SELECT kind, sha, result FROM blobs WHERE rules = ?", (rules,)):
+        BLOB_RESULTS[kind, sha] = json.loads(result_json)
+    known_blobs = set(BLOB_RESULTS)
+
+    # One timestamp for the whole run: staleness and analyzed_at are relative to it
+    now = datetime.now(timezone.utc)
+
+    # Stream the output object: header, one repo per line in input order,
+    # then the total. Same schema as a single json.dump of the whole result.
+    count = 0
+    with open(args.output, "wb") as out, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        out.write(b'{"tag": ' + dump_json_line(data.get("tag")) +
+                  b', "analyzed_at": ' + dump_json_line(now.isoformat()) +
+                  b', "repos": [\n')
+
+        # Results are written in input order, so the output does not depend on
+        # which repo finished first; each waits only for the ones before it.
+        done: dict[int, dict] = {}
+        written = 0
+
+        def emit(index: int, result: dict) -> None:
+            nonlocal written
+            done[index] = result
+            while written in done:
+                if written:
+                    out.write(b",\n")
+                out.write(dump_json_line(done.pop(written)))
+                written += 1
+            out.flush()
+
+        futures = {}
+        for index, repo in enumerate(repos):
+            row = repo.get("updated_at") and ledger.execute(
+                "SELECT json FROM labeled WHERE full_name = ? AND updated_at = ? AND rules = ?",
+                (repo["full_name"], repo["updated_at"], label_rules)).fetchone()
+            if row:
+                count += 1
+                print(f"[{count}/{len(repos)}] {repo['full_name']} (unchanged, from ledger)",
+                      file=sys.stderr)
+                emit(index, from_ledger({**json.loads(row[0]), **repo}, now))
+            else:
+                futures[pool.submit(analyze_repo, repo, headers, now, args.tarball)] = index
+
+        pending = 0
+        for future in as_completed(futures):
+            index = futures[future]
+            repo = repos[index]
+            count += 1
+            print(f"[{count}/{len(repos)}] {repo['full_name']}", file=sys.stderr)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  Error analyzing {repo['full_name']}: {e}", file=sys.stderr)
+                result = {**repo, "primary_label": "other", "signal_labels": ["error"], "error": str(e)}
+            else:
+                ledger.execute(
+                    "INSERT OR REPLACE INTO labeled (full_name, updated_at, rules, json)"
+                    " VALUES (?, ?, ?, ?)",
+                    (repo["full_name"], repo.get("updated_at"), label_rules,
+                     dump_json_line(result).decode("utf-8")))
+                pending += 1
+                if pending >= LEDGER_COMMIT_EVERY:
+                    ledger.commit()
+                    pending = 0
+
+            emit(index, result)
+
+        out.write(b'\n], "total": ' + str(count).encode() + b'}\n')
+
+    ledger.executemany(
+        "INSERT OR REPLACE INTO blobs (kind, sha, rules, result) VALUES (?, ?, ?, ?)",
+        [(kind, sha, rules, json.dumps(result))
+         for (kind, sha), result in BLOB_RESULTS.items() if (kind, sha) not in known_blobs])
+    ledger.commit()
+    ledger.close()
+    HTTP_CLIENT.close()
+    if RESPONSE_CACHE:
+        RESPONSE_CACHE.close()
+
+    print(f"\nWrote {count} labeled repos to {args.output}", file=sys.stderr)
+    print(json.dumps({"output": args.output, "count": count}))
     return 0
 
 
@@ -2,6 +2,7 @@
 # /// script
 # dependencies = [
 #   "requests>=2.32,<3",
+#   "orjson>=3.9,<4",
 # ]
 # requires-python = ">=3.11"
 # ///
@@ -11,9 +12,18 @@ Fetch GitHub repositories for a given topic tag.
 Calls the GitHub Search API to collect repo metadata and writes
 results to a JSON file for downstream analysis.
 
+When GITHUB_TOKEN is set, the GraphQL search API is used: it returns all
+fields in one request per 100 repos. Without a token (GraphQL requires
+authentication) the REST search API is used. Both write the same schema.
+
+GitHub search returns at most 1000 results per query. For --max above
+that, the query is split into created: date windows, each holding at most
+1000 matches, which are fetched in parallel and merged by repo id.
+
 Usage:
   scripts/fetch-topic-repos.py --tag agent-skills --output repos.json
   scripts/fetch-topic-repos.py --tag agent-skills --max 500 --min-stars 5
+  scripts/fetch-topic-repos.py --tag agent-skills --max 5000
 
 Exit codes:
   0  Success
@@ -22,37 +32,178 @@ Exit codes:
 """
 
 import argparse
+import functools
 import json
 import os
 import sys
 import time
-from datetime import datetime, timezone
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from operator import itemgetter
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
 except ImportError:
     print("Error: requests is required. Run: uv run scripts/fetch-topic-repos.py", file=sys.stderr)
     sys.exit(2)
 
+# Optional: orjson serializes several times faster than the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# GitHub search returns at most this many results for any one query
+SEARCH_CAP = 1000
+
+# Date windows fetched in parallel when --max exceeds SEARCH_CAP
+WINDOW_WORKERS = 4
+EARLIEST_CREATED = date(2008, 1, 1)
+
+SEARCH_QUERY = """
+query($q: String!, $first: Int!, $cursor: String) {
+  search(query: $q, type: REPOSITORY, first: $first, after: $cursor) {
+    repositoryCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on Repository {
+        databaseId
+        nameWithOwner
+        owner { login }
+        name
+        description
+        url
+        stargazerCount
+        forkCount
+        primaryLanguage { name }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        isArchived
+        updatedAt
+        createdAt
+        licenseInfo { spdxId }
+        defaultBranchRef { name }
+      }
+    }
+  }
+}
+"""
+
+
+def create_session() -> requests.Session:
+    session = requests.Session()
+    # GraphQL queries are POSTs but read-only, so they are safe to retry
+    # Retry-After is honored for 429 and 503 responses
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET", "POST"], respect_retry_after_header=True)
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    return session
+
+
+def fetch_repos_gql(query: str, max_repos: int, token: str,
+                    probe_cap: bool = False) -> tuple[list[dict], int]:
+    """Search repos via GraphQL. Returns (repos, total matching count).
+
+    With probe_cap, stop after the first page if the query matches more
+    than SEARCH_CAP repos, since the caller will split it.
+    """
+    session = create_session()
+    session.headers["Authorization"] = f"Bearer {token}"
+
+    repos = []
+    total_count = 0
+    cursor = None
+    query = f"{query} sort:stars-desc"
+
+    while len(repos) < max_repos:
+        variables = {"q": query, "first": min(100, max_repos - len(repos)), "cursor": cursor}
+        print(f"Fetching {len(repos)}+ via GraphQL...", file=sys.stderr)
+
+        try:
+            resp = session.post(GRAPHQL_URL, json={"query": SEARCH_QUERY, "variables": variables},
+                                timeout=30)
+        except requests.RequestException as e:
+            print(f"Error: network request failed: {e}", file=sys.stderr)
+            sys.exit(2)
+
+        retry_after = resp.headers.get("Retry-After", "")
+        if resp.status_code == 403 and retry_after.isdigit():
+            print(f"Secondary rate limit hit. Waiting {retry_after}s...", file=sys.stderr)
+            time.sleep(int(retry_after))
+            continue
+
+        if resp.status_code != 200:
+            print(f"Error: GitHub GraphQL API returned {resp.status_code}: {resp.text}", file=sys.stderr)
+            sys.exit(2)
 
-def fetch_repos(tag: str, max_repos: int, min_stars: int, token: str | None) -> list[dict]:
+        data = resp.json()
+        if data.get("errors"):
+            print(f"Error: GitHub GraphQL API errors: {data['errors']}", file=sys.stderr)
+            sys.exit(2)
+
+        search = data["data"]["search"]
+        for node in search["nodes"]:
+            if not node:
+                continue
+            repos.append({
+                "id": node["databaseId"],
+                "full_name": node["nameWithOwner"],
+                "owner": node["owner"]["login"],
+                "name": node["name"],
+                "description": node.get("description") or "",
+                "html_url": node["url"],
+                "stars": node["stargazerCount"],
+                "forks": node["forkCount"],
+                "language": (node.get("primaryLanguage") or {}).get("name"),
+                "topics": [t["topic"]["name"] for t in node["repositoryTopics"]["nodes"]],
+                "archived": node["isArchived"],
+                "updated_at": node["updatedAt"],
+                "created_at": node["createdAt"],
+                "license": (node.get("licenseInfo") or {}).get("spdxId"),
+                "default_branch": (node.get("defaultBranchRef") or {}).get("name", "main"),
+            })
+
+        total_count = search["repositoryCount"]
+        print(f"Total matching repos: {total_count}. Fetched so far: {len(repos)}.",
+              file=sys.stderr)
+
+        if probe_cap and total_count > SEARCH_CAP:
+            break
+        if not search["pageInfo"]["hasNextPage"]:
+            break
+        cursor = search["pageInfo"]["endCursor"]
+
+    return repos[:max_repos], total_count
+
+
+def fetch_repos(query: str, max_repos: int, token: str | None,
+                probe_cap: bool = False) -> tuple[list[dict], int]:
+    """Search repos via REST. Returns (repos, total matching count).
+
+    With probe_cap, stop after the first page if the query matches more
+    than SEARCH_CAP repos, since the caller will split it.
+    """
     headers = {
         "Accept": "application/vnd.github.v3+json",
         "X-GitHub-Api-Version": "2022-11-28",
     }
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    else:
-        print("Warning: GITHUB_TOKEN not set. Rate limited to 60 requests/hour.", file=sys.stderr)
 
+    session = create_session()
     repos = []
+    total_count = 0
     page = 1
     per_page = 100
 
     while len(repos) < max_repos:
         url = "https://api.github.com/search/repositories"
         params = {
-            "q": f"topic:{tag} stars:>={min_stars}",
+            "q": query,
             "sort": "stars",
             "order": "desc",
             "per_page": min(per_page, max_repos - len(repos)),
@@ -62,11 +213,18 @@ def fetch_repos(tag: str, max_repos: int, min_stars: int, token: str | None) ->
         print(f"Fetching page {page} ({len(repos)} repos so far)...", file=sys.stderr)
 
         try:
-            resp = requests.get(url, headers=headers, params=params, timeout=30)
+            resp = session.get(url, headers=headers, params=params, timeout=30)
         except requests.RequestException as e:
             print(f"Error: network request failed: {e}", file=sys.stderr)
             sys.exit(2)
 
+        # Secondary rate limits send Retry-After: wait it out and retry the page
+        retry_after = resp.headers.get("Retry-After", "")
+        if resp.status_code == 403 and retry_after.isdigit():
+            print(f"Secondary rate limit hit. Waiting {retry_after}s...", file=sys.stderr)
+            time.sleep(int(retry_after))
+            continue
+
         if resp.status_code == 403:
             reset = resp.headers.get("X-RateLimit-Reset", "unknown")
             print(f"Error: rate limited. Resets at {reset}. Set GITHUB_TOKEN to increase limit.", file=sys.stderr)
@@ -105,6 +263,8 @@ def fetch_repos(tag: str, max_repos: int, min_stars: int, token: str | None) ->
         total_count = data.get("total_count", 0)
         print(f"Total matching repos: {total_count}. Fetched so far: {len(repos)}.", file=sys.stderr)
 
+        if probe_cap and total_count > SEARCH_CAP:
+            break
         if len(items) < per_page or len(repos) >= max_repos:
             break
 
@@ -112,7 +272,40 @@ def fetch_repos(tag: str, max_repos: int, min_stars: int, token: str | None) ->
         # Respect secondary rate limits
         time.sleep(1)
 
-    return repos
+    return repos, total_count
+
+
+def fetch_windowed(search, query: str, max_repos: int) -> list[dict]:
+    """Collect more than SEARCH_CAP repos by splitting query into created: date windows.
+
+    search is fetch_repos or fetch_repos_gql with the token bound. A window
+    matching more than SEARCH_CAP repos is split in half until each fits.
+    """
+    found: dict[int, dict] = {}
+    with ThreadPoolExecutor(max_workers=WINDOW_WORKERS) as pool:
+        def submit(start: date, end: date):
+            window = f"{query} created:{start.isoformat()}..{end.isoformat()}"
+            # A single day cannot be split further: take its top SEARCH_CAP
+            futures[pool.submit(search, window, SEARCH_CAP, probe_cap=start < end)] = (start, end)
+
+        futures = {}
+        submit(EARLIEST_CREATED, datetime.now(timezone.utc).date())
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = futures.pop(future)
+                repos, total_count = future.result()
+                if total_count > SEARCH_CAP and start < end:
+                    mid = start + (end - start) // 2
+                    print(f"Splitting {start}..{end} ({total_count} repos)", file=sys.stderr)
+                    submit(start, mid)
+                    submit(mid + timedelta(days=1), end)
+                    continue
+                for repo in repos:
+                    found[repo["id"]] = repo
+
+    # Windows arrive out of order: restore the stars-descending order
+    return sorted(found.values(), key=itemgetter("stars"), reverse=True)[:max_repos]
 
 
 def main() -> int:
@@ -132,7 +325,17 @@ def main() -> int:
     args = parser.parse_args()
 
     token = os.environ.get("GITHUB_TOKEN")
-    repos = fetch_repos(args.tag, args.max_repos, args.min_stars, token)
+    if token:
+        search = functools.partial(fetch_repos_gql, token=token)
+    else:
+        print("Warning: GITHUB_TOKEN not set. Rate limited to 60 requests/hour.", file=sys.stderr)
+        search = functools.partial(fetch_repos, token=None)
+
+    query = f"topic:{args.tag} stars:>={args.min_stars}"
+    if args.max_repos <= SEARCH_CAP:
+        repos, _ = search(query, args.max_repos)
+    else:
+        repos = fetch_windowed(search, query, args.max_repos)
 
     output = {
         "tag": args.tag,
@@ -141,8 +344,12 @@ def main() -> int:
         "repos": repos,
     }
 
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    if orjson:
+        with open(args.output, "wb") as f:
+            f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
 
     print(f"Wrote {len(repos)} repos to {args.output}", file=sys.stderr)
     print(json.dumps({"output": args.output, "count": len(repos)}))
@@ -106,23 +106,22 @@ def format_repo_entry(repo: dict) -> str:
     desc = repo.get("description") or ""
     stars = repo.get("stars", 0)
     lang = repo.get("language") or ""
-    signals = repo.get("signal_labels", [])
+    signals = repo.get("signal_labels", ())
 
-    line = f"- **[{name}]({url})** — {desc}"
-    line += f" ⭐ {stars}"
+    parts = [f"- **[{name}]({url})** — {desc}", f" ⭐ {stars}"]
 
     if lang:
-        line += f" `{lang}`"
+        parts.append(f" `{lang}`")
 
     advisory = [s for s in signals if s in ADVISORY_SIGNALS]
     positive = [s for s in signals if s not in ADVISORY_SIGNALS]
 
     if positive:
-        line += " " + format_signals(positive)
+        parts.append(" " + format_signals(positive))
     if advisory:
-        line += " " + format_signals(advisory)
+        parts.append(" " + format_signals(advisory))
 
-    return line
+    return "".join(parts)
 
 
 def generate_readme(data: dict, tag: str) -> str:
@@ -130,34 +129,29 @@ def generate_readme(data: dict, tag: str) -> str:
     analyzed_at = data.get("analyzed_at", "")
     total = data.get("total", len(repos))
 
-    # Group by primary label
+    # Group by primary label and count stats in a single pass
     by_category: dict[str, list] = {cat: [] for cat in CATEGORY_ORDER}
+    misleading_count = 0
+    confirmed_security_count = 0
+    unverified_security_count = 0
     for repo in repos:
         label = repo.get("primary_label", "other")
-        if label in by_category:
-            by_category[label].append(repo)
-        else:
-            by_category["other"].append(repo)
+        by_category.get(label, by_category["other"]).append(repo)
+
+        signals = frozenset(repo.get("signal_labels", ()))
+        if "misleading" in signals:
+            misleading_count += 1
+        if signals & CONFIRMED_SECURITY:
+            confirmed_security_count += 1
+        elif signals & UNVERIFIED_SECURITY:
+            unverified_security_count += 1
 
     # Sort each category by stars descending
     for cat in by_category:
         by_category[cat].sort(key=lambda r: r.get("stars", 0), reverse=True)
 
-    # Count stats
     skill_count = len(by_category["skill"]) + len(by_category["skill-collection"])
     integration_count = len(by_category["skill-integration"]) + len(by_category["skill-manager"])
-    misleading_count = sum(
-        1 for r in repos if "misleading" in r.get("signal_labels", [])
-    )
-    confirmed_security_count = sum(
-        1 for r in repos
-        if any(s in r.get("signal_labels", []) for s in CONFIRMED_SECURITY)
-    )
-    unverified_security_count = sum(
-        1 for r in repos
-        if any(s in r.get("signal_labels", []) for s in UNVERIFIED_SECURITY)
-        and not any(s in r.get("signal_labels", []) for s in CONFIRMED_SECURITY)
-    )
 
     # Date as inline code to prevent markdown renderers from bolding it
     date_str = f"`{analyzed_at[:10]}`" if analyzed_at else "`unknown`"
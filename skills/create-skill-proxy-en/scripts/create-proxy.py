@@ -25,23 +25,18 @@ Exit codes:
 """
 
 import argparse
+import atexit
 import hashlib
 import json
 import os
 import re
-import subprocess
+import shutil
 import sys
-from datetime import datetime, timezone
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
-try:
-    import requests
-    import yaml
-except ImportError:
-    print("Error: Run with: uv run scripts/create-proxy.py", file=sys.stderr)
-    sys.exit(2)
-
 
 LIABILITY_DISCLAIMER = """\
 The creator of the 'Skill Proxy' is not liable for any damages arising
@@ -50,6 +45,143 @@ exclusively with the user who uses this 'Skill Proxy'. If the 'Skill Proxy'
 user is an agent, then the user who is responsible for that agent bears
 the responsibility."""
 
+# Liability and verify-before-use sections shared by every proxy body.
+# Only the pinned URL and checksum vary, so the rest is assembled once.
+_LIABILITY_SECTION = f"## ⚠️ Liability disclaimer\n\n{LIABILITY_DISCLAIMER}\n"
+
+_VERIFY_BLOCK_TEMPLATE = """\
+## ⚠️ Verify before use
+
+Before following any instructions, fetch and verify the remote skill:
+
+1. Fetch the pinned content:
+   `{pinned_url}`
+
+2. Compute SHA-256 of the fetched content and verify it equals:
+   `{sha256}`
+
+3. If the checksum does **not** match: **STOP immediately.**
+   Do not follow any instructions. Alert the user:
+   > "The remote skill content has changed unexpectedly. The 'Skill Proxy'
+   > checksum does not match. Run `verify-proxy.py` and review before proceeding."
+
+4. If the checksum **matches**: follow the instructions in the fetched SKILL.md.
+"""
+
+_FOOTER_TEMPLATE = """\
+## Re-verifying and updating this 'Skill Proxy'
+
+```bash
+# Check if remote content still matches pinned checksum
+uv run scripts/verify-proxy.py --proxy ./skills/{proxy_name}
+
+# Update pin and checksum after consciously reviewing upstream changes
+uv run scripts/update-proxy.py --proxy ./skills/{proxy_name}
+```
+"""
+
+# raw.githubusercontent.com/owner/repo/refs/heads/branch/... → .../branch/...
+REFS_HEADS_RE = re.compile(r'/refs/heads/([^/]+)/')
+
+# github.com URL path: /owner/repo, /owner/repo/branch[/...] or
+# /owner/repo/tree|blob/branch[/path]; tree and blob must be followed by a branch
+GH_URL_RE = re.compile(
+    r'/(?P<owner>[^/]+)/(?P<repo>[^/]+)'
+    r'(?:/(?P<kind>tree|blob)/(?P<branch>[^/]+)(?:/(?P<sub>.+))?'
+    r'|/(?!(?:tree|blob)(?:/|$))(?P<ref>[^/]+)(?:/.*)?)?/?'
+)
+
+# agentskills.io name characters: lowercase ASCII letters, digits and hyphens
+NAME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+
+# A full 40-hex commit SHA
+SHA_RE = re.compile(r'[0-9a-f]{40}')
+
+# Body lines that cannot serve as the summary: headings, tables, code fences
+SUMMARY_SKIP = ("#", "|", "```")
+
+# Strings emitted as plain YAML scalars: no quoting, flow or comment characters,
+# and a leading letter so nothing reads back as a number or timestamp
+PLAIN_SCALAR_RE = re.compile(r'[A-Za-z][A-Za-z0-9._/:-]*')
+
+# Plain scalars that YAML 1.1 would load as booleans or null
+YAML_RESERVED = {"y", "n", "yes", "no", "true", "false", "on", "off", "null"}
+
+# Characters json.dumps leaves literal that YAML rejects (DEL, C1 controls,
+# surrogates, U+FFFE/U+FFFF) or reads as line breaks (NEL, U+2028/U+2029)
+YAML_UNSAFE_RE = re.compile('[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufffe\uffff]')
+
+# Read size for streamed downloads that are hashed on the fly
+HASH_CHUNK_SIZE = 65536
+
+# Last commits API ETag and SHA per owner/repo@branch. A 304 revalidation
+# does not count against the GitHub rate limit.
+ETAG_CACHE_PATH = Path.home() / ".cache" / "skill-proxy" / "etags.json"
+
+
+class _Log:
+    """
+    Progress output for stderr, written in one call per flush() instead
+    of one write per line. main() flushes before each step that can block
+    or exit, so the output order is unchanged.
+    """
+
+    def __init__(self) -> None:
+        self.buf: list[str] = []
+
+    def line(self, s: str = "") -> None:
+        self.buf.append(s + "\n")
+
+    def flush(self) -> None:
+        if self.buf:
+            sys.stderr.write("".join(self.buf))
+            sys.stderr.flush()
+            self.buf.clear()
+
+
+LOG = _Log()
+# Also covers lines still buffered when sys.exit() is called
+atexit.register(LOG.flush)
+
+
+def create_session() -> "requests.Session":
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    session = requests.Session()
+    # requests already negotiates gzip; GitHub asks API clients to send a User-Agent
+    session.headers["User-Agent"] = "skill-proxy"
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+# requests and PyYAML, imported by _import_deps() once arguments are parsed
+requests = yaml = SafeLoader = SESSION = None
+
+
+def _import_deps() -> None:
+    """
+    Import requests and PyYAML and open the shared session. Deferred until
+    after argument parsing, so --help and usage errors return without
+    loading them.
+    """
+    global requests, yaml, SafeLoader, SESSION
+    try:
+        import requests
+        import yaml
+    except ImportError:
+        print("Error: Run with: uv run scripts/create-proxy.py", file=sys.stderr)
+        sys.exit(2)
+    # Prefer the libyaml-backed C loader (bundled with PyYAML wheels)
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    # One session per run: keep-alive connections are reused across requests
+    SESSION = create_session()
+
 
 # ── URL translation ──────────────────────────────────────────────────────────
 
@@ -70,7 +202,7 @@ def translate_url(input_url: str) -> tuple[str, str, str, str, str]:
 
     # Already a raw URL
     if "raw.githubusercontent.com" in u:
-        raw = re.sub(r'/refs/heads/([^/]+)/', r'/\1/', u)
+        raw = REFS_HEADS_RE.sub(r'/\1/', u)
         parts = urlparse(raw).path.lstrip("/").split("/")
         owner, repo = parts[0], parts[1]
         branch = parts[2]
@@ -85,31 +217,21 @@ def translate_url(input_url: str) -> tuple[str, str, str, str, str]:
               file=sys.stderr)
         sys.exit(1)
 
-    path = urlparse(u).path.lstrip("/").split("/")
-    owner = path[0]
-    repo  = path[1]
+    m = GH_URL_RE.fullmatch(urlparse(u).path)
+    if not m:
+        print(f"Error: cannot parse URL (expected /owner/repo[/tree/branch[/path]]): {input_url}",
+              file=sys.stderr)
+        sys.exit(1)
+    owner, repo, kind, sub = m.group("owner", "repo", "kind", "sub")
+    branch = m.group("branch") or m.group("ref") or "main"
 
-    if len(path) <= 2:
-        branch = "main"
+    # A bare /owner/repo/branch URL ignores anything after the branch
+    if not kind or not sub:
         skill_path = "SKILL.md"
-
-    elif path[2] == "tree":
-        branch = path[3]
-        if len(path) > 4:
-            subpath = "/".join(path[4:])
-            skill_path = subpath.rstrip("/") + "/SKILL.md"
-        else:
-            skill_path = "SKILL.md"
-
-    elif path[2] == "blob":
-        branch = path[3]
-        skill_path = "/".join(path[4:])
-        if not skill_path.endswith("SKILL.md"):
-            skill_path = skill_path.rstrip("/") + "/SKILL.md"
-
+    elif kind == "blob" and sub.endswith("SKILL.md"):
+        skill_path = sub
     else:
-        branch = path[2]
-        skill_path = "SKILL.md"
+        skill_path = sub.rstrip("/") + "/SKILL.md"
 
     raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{skill_path}"
     return raw_url, owner, repo, branch, skill_path
@@ -117,56 +239,158 @@ def translate_url(input_url: str) -> tuple[str, str, str, str, str]:
 
 # ── GitHub API helpers ───────────────────────────────────────────────────────
 
-def get_commit_hash(owner: str, repo: str, branch: str, token: str | None) -> str:
-    headers = {"Accept": "application/vnd.github.v3+json"}
+def load_etag_cache() -> dict:
+    try:
+        return json.loads(ETAG_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_etag_cache(cache: dict) -> None:
+    """Write the cache atomically, so a concurrent run never reads a partial file."""
+    try:
+        ETAG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ETAG_CACHE_PATH.with_name(f"{ETAG_CACHE_PATH.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+        os.replace(tmp, ETAG_CACHE_PATH)
+    except OSError as e:
+        print(f"  (could not write ETag cache: {e})", file=sys.stderr)
+
+
+def ls_remote_sha(owner: str, repo: str, branch: str) -> str | None:
+    """
+    HEAD commit of branch via `git ls-remote`: one line of output and no API
+    quota. None if git is missing or the lookup fails, e.g. for a private
+    repo or a tag; the caller then falls back to the commits API.
+    """
+    import subprocess
+
+    ref = f"refs/heads/{branch}"
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", f"https://github.com/{owner}/{repo}.git", ref],
+            capture_output=True, text=True, timeout=15,
+            # Fail instead of prompting for credentials on private repos
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    for line in result.stdout.splitlines():
+        sha, _, name = line.partition("\t")
+        if name == ref and SHA_RE.fullmatch(sha):
+            return sha
+    return None
+
+
+def get_commit_hash(owner: str, repo: str, branch: str, token: str | None,
+                    use_cache: bool = True) -> str:
+    sha = ls_remote_sha(owner, repo, branch)
+    if sha:
+        return sha
+    # The sha media type returns just the 40-hex commit SHA as text/plain
+    headers = {"Accept": "application/vnd.github.sha"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    key = f"{owner}/{repo}@{branch}"
+    cache = load_etag_cache() if use_cache else {}
+    cached = cache.get(key)
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
     url = f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}"
     try:
-        resp = requests.get(url, headers=headers, timeout=20)
+        resp = SESSION.get(url, headers=headers, timeout=20)
     except requests.RequestException as e:
         print(f"Error fetching commit hash: {e}", file=sys.stderr)
         sys.exit(2)
+    if resp.status_code == 304 and cached:
+        return cached["sha"]
     if resp.status_code == 404:
         print(f"Error: repo or branch not found: {owner}/{repo}@{branch}", file=sys.stderr)
         sys.exit(2)
     if resp.status_code != 200:
         print(f"Error: GitHub API returned {resp.status_code}", file=sys.stderr)
         sys.exit(2)
-    return resp.json()["sha"]
+    # Decode explicitly: resp.text would guess the charset first
+    sha = resp.content.decode("utf-8", errors="replace").strip()
+    if not SHA_RE.fullmatch(sha):
+        print(f"Error: unexpected commit SHA from GitHub API: {sha[:80]!r}", file=sys.stderr)
+        sys.exit(2)
+    if use_cache and resp.headers.get("ETag"):
+        cache[key] = {"etag": resp.headers["ETag"], "sha": sha}
+        save_etag_cache(cache)
+    return sha
 
 
-def fetch_raw_content(raw_url: str) -> str:
+def fetch_raw_content(raw_url: str) -> tuple[str, str]:
+    """
+    Fetch the remote SKILL.md, hashing the bytes as they arrive.
+    Returns (content, sha256 hex digest of the raw bytes).
+    """
+    digest = hashlib.sha256()
+    buf = bytearray()
     try:
-        resp = requests.get(raw_url, timeout=20)
+        with SESSION.get(raw_url, timeout=20, stream=True) as resp:
+            if resp.status_code == 404:
+                print(f"Error: SKILL.md not found at {raw_url}", file=sys.stderr)
+                sys.exit(2)
+            if resp.status_code != 200:
+                print(f"Error: HTTP {resp.status_code} fetching {raw_url}", file=sys.stderr)
+                sys.exit(2)
+            for chunk in resp.iter_content(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+                buf += chunk
     except requests.RequestException as e:
         print(f"Error fetching remote skill: {e}", file=sys.stderr)
         sys.exit(2)
-    if resp.status_code == 404:
-        print(f"Error: SKILL.md not found at {raw_url}", file=sys.stderr)
-        sys.exit(2)
-    if resp.status_code != 200:
-        print(f"Error: HTTP {resp.status_code} fetching {raw_url}", file=sys.stderr)
-        sys.exit(2)
-    return resp.text
+    return buf.decode("utf-8", errors="replace"), digest.hexdigest()
 
 
 # ── Frontmatter parsing + validation ────────────────────────────────────────
 
-def parse_frontmatter(content: str) -> dict:
+def _split_frontmatter(content: str) -> tuple[str, str] | None:
+    """
+    Split a '---'-delimited document into (frontmatter_text, body).
+    Returns None if there is no frontmatter or it is not closed.
+    """
+    if not content.startswith("---"):
+        return None
+    end = content.find("\n---", 3)
+    if end == -1:
+        return None
+    body_start = content.find("\n", end + 4)
+    return content[3:end], content[body_start + 1:] if body_start != -1 else ""
+
+
+def parse_skill_md(content: str) -> tuple[dict, str]:
+    """
+    Parse the remote SKILL.md in one pass over its text.
+    Returns (frontmatter, summary): the summary is the first prose line of
+    the body, skipping headings, tables and code fences.
+    """
     if not content.startswith("---"):
         print("Error: remote SKILL.md has no YAML frontmatter", file=sys.stderr)
         sys.exit(3)
-    end = content.find("---", 3)
-    if end == -1:
+    split = _split_frontmatter(content)
+    if split is None:
         print("Error: remote SKILL.md frontmatter is not closed", file=sys.stderr)
         sys.exit(3)
+    fm_text, body = split
     try:
-        fm = yaml.safe_load(content[3:end]) or {}
+        fm = yaml.load(fm_text, Loader=SafeLoader) or {}
     except yaml.YAMLError as e:
         print(f"Error: invalid YAML frontmatter: {e}", file=sys.stderr)
         sys.exit(3)
-    return fm
+    for line in body.splitlines():
+        line = line.strip()
+        if line and not line.startswith(SUMMARY_SKIP):
+            return fm, line
+    return fm, ""
+
+
+def _valid_name(name) -> bool:
+    """Lowercase alphanumerics and hyphens, with no leading or trailing hyphen."""
+    return (isinstance(name, str) and name[:1] not in ("", "-") and name[-1] != "-"
+            and NAME_CHARS.issuperset(name))
 
 
 def validate_frontmatter(fm: dict) -> list[str]:
@@ -174,7 +398,7 @@ def validate_frontmatter(fm: dict) -> list[str]:
     name = fm.get("name", "")
     if not name:
         errors.append("missing 'name'")
-    elif not re.match(r'^[a-z0-9][a-z0-9-]*[a-z0-9]$|^[a-z0-9]$', name):
+    elif not _valid_name(name):
         errors.append(f"invalid name format: {name!r}")
     elif "--" in name:
         errors.append(f"consecutive hyphens in name: {name!r}")
@@ -187,17 +411,34 @@ def validate_frontmatter(fm: dict) -> list[str]:
     return errors
 
 
-def extract_summary(content: str) -> str:
-    """Extract the first non-heading paragraph from the SKILL.md body."""
-    body = content.split("---", 2)[-1].strip() if content.count("---") >= 2 else content
-    for line in body.splitlines():
-        line = line.strip()
-        if line and not line.startswith("#") and not line.startswith("|") and not line.startswith("```"):
-            return line
-    return ""
+# ── Proxy generation ─────────────────────────────────────────────────────────
 
+def _yaml_str(s: str) -> str:
+    """
+    s as a YAML scalar: bare when it cannot be misread, otherwise a JSON
+    string, which is also a valid double-quoted YAML scalar once the
+    characters YAML treats differently are escaped too.
+    """
+    if PLAIN_SCALAR_RE.fullmatch(s) and not s.endswith(":") and s.lower() not in YAML_RESERVED:
+        return s
+    return YAML_UNSAFE_RE.sub(lambda m: f"\\u{ord(m[0]):04x}", json.dumps(s, ensure_ascii=False))
+
+
+def _emit_frontmatter(fm: dict) -> str:
+    """
+    Emit the proxy frontmatter: string values and one level of nested
+    mappings, in insertion order. Its shape is fixed, so the full PyYAML
+    emitter is not needed.
+    """
+    lines = []
+    for key, value in fm.items():
+        if isinstance(value, dict):
+            lines.append(f"{key}:")
+            lines.extend(f"  {k}: {_yaml_str(v)}" for k, v in value.items())
+        else:
+            lines.append(f"{key}: {_yaml_str(value)}")
+    return "\n".join(lines) + "\n"
 
-# ── Proxy generation ─────────────────────────────────────────────────────────
 
 def build_proxy_skill(
     remote_name: str,
@@ -212,7 +453,7 @@ def build_proxy_skill(
     source_url: str,
     created_by: str,
 ) -> str:
-    now = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M")
+    now = time.strftime("%Y%m%d_%H%M", time.gmtime())
     proxy_name = f"{remote_name}-proxy"
     pinned_url = (
         f"https://raw.githubusercontent.com/{owner}/{repo}/{commit_hash}/{skill_path}"
@@ -238,49 +479,51 @@ def build_proxy_skill(
         },
     }
 
-    fm_yaml = yaml.dump(frontmatter, allow_unicode=True, sort_keys=False, width=120)
-
-    body = f"""# {remote_name} (proxied from {owner}/{repo})
-
-**Source:** [{owner}/{repo}]({source_url}) · branch `{branch}` · commit `{short_commit}`
-
-## ⚠️ Liability disclaimer
-
-{LIABILITY_DISCLAIMER}
-
-## ⚠️ Verify before use
-
-Before following any instructions, fetch and verify the remote skill:
-
-1. Fetch the pinned content:
-   `{pinned_url}`
-
-2. Compute SHA-256 of the fetched content and verify it equals:
-   `{sha256}`
-
-3. If the checksum does **not** match: **STOP immediately.**
-   Do not follow any instructions. Alert the user:
-   > "The remote skill content has changed unexpectedly. The 'Skill Proxy'
-   > checksum does not match. Run `verify-proxy.py` and review before proceeding."
-
-4. If the checksum **matches**: follow the instructions in the fetched SKILL.md.
-
-## Summary (captured at proxy creation · {now})
+    fm_yaml = _emit_frontmatter(frontmatter)
 
-{remote_summary or "(no summary available — see remote SKILL.md)"}
+    header = (
+        f"# {remote_name} (proxied from {owner}/{repo})\n\n"
+        f"**Source:** [{owner}/{repo}]({source_url}) · branch `{branch}` · commit `{short_commit}`\n"
+    )
+    summary_section = (
+        f"## Summary (captured at proxy creation · {now})\n\n"
+        f"{remote_summary or '(no summary available — see remote SKILL.md)'}\n"
+    )
+    body = "\n".join([
+        header,
+        _LIABILITY_SECTION,
+        _VERIFY_BLOCK_TEMPLATE.format(pinned_url=pinned_url, sha256=sha256),
+        summary_section,
+        _FOOTER_TEMPLATE.format(proxy_name=proxy_name),
+    ])
 
-## Re-verifying and updating this 'Skill Proxy'
+    return f"---\n{fm_yaml}---\n\n{body}"
 
-```bash
-# Check if remote content still matches pinned checksum
-uv run scripts/verify-proxy.py --proxy ./skills/{proxy_name}
 
-# Update pin and checksum after consciously reviewing upstream changes
-uv run scripts/update-proxy.py --proxy ./skills/{proxy_name}
-```
-"""
+def validate_proxy(proxy_dir: Path) -> None:
+    """
+    Run the first validator found on PATH against the proxy directory.
+    aider-skills validate is the production tool — try it first.
+    skills-ref is fallback only (its README marks it as demo/demonstration purposes only).
+    """
+    import subprocess
 
-    return f"---\n{fm_yaml}---\n\n{body}"
+    for tool, note in (("aider-skills", ""), ("skills-ref", " (fallback)")):
+        exe = shutil.which(tool)
+        if exe:
+            break
+    else:
+        LOG.line("  (neither aider-skills nor skills-ref found — skipping validation)")
+        LOG.line("  Install with: pip install aider-skills")
+        return
+    result = subprocess.run(
+        [exe, "validate", str(proxy_dir)],
+        capture_output=True, text=True, check=False, stdin=subprocess.DEVNULL,
+    )
+    if result.returncode == 0:
+        LOG.line(f"  ✓ Proxy skill passes {tool} validate{note}")
+    else:
+        LOG.line(f"  ⚠ {tool} validate output:\n{result.stdout}{result.stderr}")
 
 
 # ── Main ─────────────────────────────────────────────────────────────────────
@@ -296,44 +539,51 @@ def main() -> int:
                         help="Parent directory to write the proxy skill (default: ./skills)")
     parser.add_argument("--created-by", default=os.environ.get("USER", "unknown"),
                         help="Name to write in proxy-created-by (default: $USER)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Do not use the commits API ETag cache ({ETAG_CACHE_PATH})")
     args = parser.parse_args()
+    _import_deps()
 
     token = os.environ.get("GITHUB_TOKEN")
 
     # 1. Translate URL
-    print(f"Translating URL: {args.url}", file=sys.stderr)
+    LOG.line(f"Translating URL: {args.url}")
+    LOG.flush()
     raw_url, owner, repo, branch, skill_path = translate_url(args.url)
-    print(f"  → raw URL: {raw_url}", file=sys.stderr)
-
-    # 2. Fetch content
-    print("Fetching remote SKILL.md...", file=sys.stderr)
-    content = fetch_raw_content(raw_url)
+    LOG.line(f"  → raw URL: {raw_url}")
+
+    # 2. Fetch content and HEAD commit hash concurrently (independent requests)
+    LOG.line("Fetching remote SKILL.md...")
+    LOG.line(f"Fetching HEAD commit hash for {owner}/{repo}@{branch}...")
+    LOG.flush()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        content_future = pool.submit(fetch_raw_content, raw_url)
+        commit_future = pool.submit(get_commit_hash, owner, repo, branch, token,
+                                    use_cache=not args.no_cache)
+        # A sys.exit() inside either fetch is re-raised here
+        content, sha256 = content_future.result()
+        commit_hash = commit_future.result()
 
     # 3. Validate frontmatter
-    print("Validating remote skill frontmatter...", file=sys.stderr)
-    fm = parse_frontmatter(content)
+    LOG.line("Validating remote skill frontmatter...")
+    LOG.flush()
+    fm, summary = parse_skill_md(content)
     errors = validate_frontmatter(fm)
     if errors:
-        print("Error: remote skill failed validation:", file=sys.stderr)
+        LOG.line("Error: remote skill failed validation:")
         for e in errors:
-            print(f"  - {e}", file=sys.stderr)
-        print("Proxy not created. Fix the remote skill first.", file=sys.stderr)
+            LOG.line(f"  - {e}")
+        LOG.line("Proxy not created. Fix the remote skill first.")
         sys.exit(3)
-    print(f"  ✓ Valid skill: {fm['name']}", file=sys.stderr)
-
-    # 4. Fetch HEAD commit hash
-    print(f"Fetching HEAD commit hash for {owner}/{repo}@{branch}...", file=sys.stderr)
-    commit_hash = get_commit_hash(owner, repo, branch, token)
-    print(f"  → commit: {commit_hash[:12]}", file=sys.stderr)
+    LOG.line(f"  ✓ Valid skill: {fm['name']}")
 
-    # 5. Compute SHA-256
-    sha256 = hashlib.sha256(content.encode("utf-8")).hexdigest()
-    print(f"  → SHA-256: {sha256}", file=sys.stderr)
+    # 4. Pinned commit (fetched in step 2)
+    LOG.line(f"  → commit: {commit_hash[:12]}")
 
-    # 6. Extract summary
-    summary = extract_summary(content)
+    # 5. SHA-256 (computed while fetching)
+    LOG.line(f"  → SHA-256: {sha256}")
 
-    # 7. Build proxy SKILL.md
+    # 6. Build proxy SKILL.md
     proxy_content = build_proxy_skill(
         remote_name=fm["name"],
         remote_desc=str(fm.get("description", "")),
@@ -348,57 +598,27 @@ def main() -> int:
         created_by=args.created_by,
     )
 
-    # 8. Write proxy skill
+    # 7. Write proxy skill
     proxy_name = f"{fm['name']}-proxy"
     proxy_dir = Path(args.output_dir) / proxy_name
     proxy_dir.mkdir(parents=True, exist_ok=True)
     proxy_skill_path = proxy_dir / "SKILL.md"
     proxy_skill_path.write_text(proxy_content, encoding="utf-8")
-    print(f"Wrote proxy skill: {proxy_skill_path}", file=sys.stderr)
-
-    # 9. Validate generated proxy skill.
-    # aider-skills validate is the production tool — try it first.
-    # skills-ref is fallback only (its README marks it as demo/demonstration purposes only).
-    print("Validating generated proxy skill...", file=sys.stderr)
-    validated = False
-    try:
-        result = subprocess.run(
-            ["aider-skills", "validate", str(proxy_dir)],
-            capture_output=True, text=True
-        )
-        if result.returncode == 0:
-            print("  ✓ Proxy skill passes aider-skills validate", file=sys.stderr)
-        else:
-            print(f"  ⚠ aider-skills validate output:\n{result.stdout}{result.stderr}",
-                  file=sys.stderr)
-        validated = True
-    except FileNotFoundError:
-        pass
-
-    if not validated:
-        try:
-            result = subprocess.run(
-                ["skills-ref", "validate", str(proxy_dir)],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                print("  ✓ Proxy skill passes skills-ref validate (fallback)", file=sys.stderr)
-            else:
-                print(f"  ⚠ skills-ref validate output:\n{result.stdout}{result.stderr}",
-                      file=sys.stderr)
-        except FileNotFoundError:
-            print("  (neither aider-skills nor skills-ref found — skipping validation)",
-                  file=sys.stderr)
-            print("  Install with: pip install aider-skills", file=sys.stderr)
-
-    # 10. Summary
-    print(f"\n✓ Created 'Skill Proxy': {proxy_dir}", file=sys.stderr)
-    print(f"  Remote  : {args.url}", file=sys.stderr)
-    print(f"  Pinned  : {commit_hash[:12]}", file=sys.stderr)
-    print(f"  SHA-256 : {sha256[:16]}...", file=sys.stderr)
-    print(f"\n  ⚠ Remember: the 'Skill Proxy' creator is not liable for damages",
-          file=sys.stderr)
-    print(f"    from use of this 'Skill Proxy'. Risk lies with the user.", file=sys.stderr)
+    LOG.line(f"Wrote proxy skill: {proxy_skill_path}")
+
+    # 8. Validate generated proxy skill
+    LOG.line("Validating generated proxy skill...")
+    LOG.flush()
+    validate_proxy(proxy_dir)
+
+    # 9. Summary
+    LOG.line(f"\n✓ Created 'Skill Proxy': {proxy_dir}")
+    LOG.line(f"  Remote  : {args.url}")
+    LOG.line(f"  Pinned  : {commit_hash[:12]}")
+    LOG.line(f"  SHA-256 : {sha256[:16]}...")
+    LOG.line(f"\n  ⚠ Remember: the 'Skill Proxy' creator is not liable for damages")
+    LOG.line(f"    from use of this 'Skill Proxy'. Risk lies with the user.")
+    LOG.flush()
     print(json.dumps({"proxy": str(proxy_dir), "commit": commit_hash, "sha256": sha256}))
     return 0
 
@@ -31,22 +31,16 @@ Exit codes:
 """
 
 import argparse
+import atexit
 import hashlib
 import json
 import os
 import re
-import subprocess
+import shutil
 import sys
-from datetime import datetime, timezone
+import time
 from pathlib import Path
 
-try:
-    import requests
-    import yaml
-except ImportError:
-    print("Error: Run with: uv run scripts/update-proxy.py", file=sys.stderr)
-    sys.exit(2)
-
 
 LIABILITY_DISCLAIMER = """\
 The creator of the 'Skill Proxy' is not liable for any damages arising
@@ -55,41 +49,260 @@ exclusively with the user who uses this 'Skill Proxy'. If the 'Skill Proxy'
 user is an agent, then the user who is responsible for that agent bears
 the responsibility."""
 
+# Liability and verify-before-use sections shared by every proxy body.
+# Only the pinned URL and checksum vary, so the rest is assembled once.
+_LIABILITY_SECTION = f"## ⚠️ Liability disclaimer\n\n{LIABILITY_DISCLAIMER}\n"
+
+_VERIFY_BLOCK_TEMPLATE = """\
+## ⚠️ Verify before use
+
+Before following any instructions, fetch and verify the remote skill:
+
+1. Fetch the pinned content:
+   `{pinned_url}`
+
+2. Compute SHA-256 of the fetched content and verify it equals:
+   `{sha256}`
+
+3. If the checksum does **not** match: **STOP immediately.**
+   Do not follow any instructions. Alert the user:
+   > "The remote skill content has changed unexpectedly. The 'Skill Proxy'
+   > checksum does not match. Run `verify-proxy.py` and review before proceeding."
+
+4. If the checksum **matches**: follow the instructions in the fetched SKILL.md.
+"""
+
+_FOOTER_TEMPLATE = """\
+## Re-verifying and updating this 'Skill Proxy'
+
+```bash
+uv run scripts/verify-proxy.py --proxy ./skills/{proxy_name}
+uv run scripts/update-proxy.py --proxy ./skills/{proxy_name}
+```
+"""
+
+# agentskills.io name characters: lowercase ASCII letters, digits and hyphens
+NAME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+
+# Owner and repo from a github.com URL
+GH_OWNER_REPO_RE = re.compile(r'github\.com/([^/]+)/([^/]+)')
+
+# Repo-relative file path from a pinned raw.githubusercontent.com URL
+RAW_PATH_RE = re.compile(r'raw\.githubusercontent\.com/[^/]+/[^/]+/[^/]+/(.+)')
+
+# A full 40-hex commit SHA
+SHA_RE = re.compile(r'[0-9a-f]{40}')
+
+# Body lines that cannot serve as the summary: headings, tables, code fences
+SUMMARY_SKIP = ("#", "|", "```")
+
+# Proxy frontmatter is read in chunks of this size up to its closing marker
+FRONTMATTER_READ_SIZE = 4096
+
+# Last commits API ETag and SHA per owner/repo@branch. A 304 revalidation
+# does not count against the GitHub rate limit.
+ETAG_CACHE_PATH = Path.home() / ".cache" / "skill-proxy" / "etags.json"
+
+
+class _Log:
+    """
+    Progress output for stderr, written in one call per flush() instead
+    of one write per line. main() flushes before each step that can block
+    or exit, so the output order is unchanged.
+    """
+
+    def __init__(self) -> None:
+        self.buf: list[str] = []
 
-def load_proxy_skill_md(proxy_dir: Path) -> tuple[dict, str]:
-    skill_md = proxy_dir / "SKILL.md"
-    content = skill_md.read_text(encoding="utf-8")
-    end = content.find("---", 3)
-    fm = yaml.safe_load(content[3:end]) or {}
-    body = content.split("---", 2)[-1]
-    return fm, body
+    def line(self, s: str = "") -> None:
+        self.buf.append(s + "\n")
 
+    def flush(self) -> None:
+        if self.buf:
+            sys.stderr.write("".join(self.buf))
+            sys.stderr.flush()
+            self.buf.clear()
 
-def fetch_raw(url: str) -> str:
+
+LOG = _Log()
+# Also covers lines still buffered when sys.exit() is called
+atexit.register(LOG.flush)
+
+
+def create_session() -> "requests.Session":
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    session = requests.Session()
+    # requests already negotiates gzip; GitHub asks API clients to send a User-Agent
+    session.headers["User-Agent"] = "skill-proxy"
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+# requests and PyYAML, imported by _import_deps() once arguments are parsed
+requests = yaml = SafeLoader = SafeDumper = SESSION = None
+
+
+def _import_deps() -> None:
+    """
+    Import requests and PyYAML and open the shared session. Deferred until
+    after argument parsing, so --help and usage errors return without
+    loading them.
+    """
+    global requests, yaml, SafeLoader, SafeDumper, SESSION
+    try:
+        import requests
+        import yaml
+    except ImportError:
+        print("Error: Run with: uv run scripts/update-proxy.py", file=sys.stderr)
+        sys.exit(2)
+    # Prefer the libyaml-backed C loader/dumper (bundled with PyYAML wheels)
+    try:
+        from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    except ImportError:
+        from yaml import SafeLoader, SafeDumper
+    # One session per run: keep-alive connections are reused across requests
+    SESSION = create_session()
+
+
+def _split_frontmatter(content: str) -> tuple[str, str] | None:
+    """
+    Split a '---'-delimited document into (frontmatter_text, body).
+    Returns None if there is no frontmatter or it is not closed.
+    """
+    if not content.startswith("---"):
+        return None
+    end = content.find("\n---", 3)
+    if end == -1:
+        return None
+    body_start = content.find("\n", end + 4)
+    return content[3:end], content[body_start + 1:] if body_start != -1 else ""
+
+
+def _read_frontmatter(path: Path) -> str | None:
+    """
+    Read only the '---'-delimited frontmatter of a file, stopping at the
+    closing marker instead of loading the whole body.
+    Returns None if there is no frontmatter or it is not closed.
+    """
+    with path.open("rb") as f:
+        head = f.read(FRONTMATTER_READ_SIZE)
+        if not head.startswith(b"---"):
+            return None
+        end = head.find(b"\n---", 3)
+        while end == -1:
+            chunk = f.read(FRONTMATTER_READ_SIZE)
+            if not chunk:
+                return None
+            # Resume just before the old end in case the marker spans chunks
+            start = max(3, len(head) - 3)
+            head += chunk
+            end = head.find(b"\n---", start)
+    return head[3:end].decode("utf-8")
+
+
+def load_proxy_frontmatter(proxy_dir: Path) -> dict:
+    # The body is regenerated from scratch, so only the frontmatter is read
+    fm_text = _read_frontmatter(proxy_dir / "SKILL.md")
+    return yaml.load(fm_text or "", Loader=SafeLoader) or {}
+
+
+def fetch_raw(url: str) -> bytes:
     try:
-        resp = requests.get(url, timeout=20)
+        resp = SESSION.get(url, timeout=20)
     except requests.RequestException as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(2)
     if resp.status_code != 200:
         print(f"Error: HTTP {resp.status_code}", file=sys.stderr)
         sys.exit(2)
-    return resp.text
+    return resp.content
 
 
-def get_head_commit(owner: str, repo: str, branch: str) -> str:
+def load_etag_cache() -> dict:
+    try:
+        return json.loads(ETAG_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_etag_cache(cache: dict) -> None:
+    """Write the cache atomically, so a concurrent run never reads a partial file."""
+    try:
+        ETAG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ETAG_CACHE_PATH.with_name(f"{ETAG_CACHE_PATH.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+        os.replace(tmp, ETAG_CACHE_PATH)
+    except OSError as e:
+        print(f"  (could not write ETag cache: {e})", file=sys.stderr)
+
+
+def ls_remote_sha(owner: str, repo: str, branch: str) -> str | None:
+    """
+    HEAD commit of branch via `git ls-remote`: one line of output and no API
+    quota. None if git is missing or the lookup fails, e.g. for a private
+    repo or a tag; the caller then falls back to the commits API.
+    """
+    import subprocess
+
+    ref = f"refs/heads/{branch}"
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", f"https://github.com/{owner}/{repo}.git", ref],
+            capture_output=True, text=True, timeout=15,
+            # Fail instead of prompting for credentials on private repos
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    for line in result.stdout.splitlines():
+        sha, _, name = line.partition("\t")
+        if name == ref and SHA_RE.fullmatch(sha):
+            return sha
+    return None
+
+
+def get_head_commit(owner: str, repo: str, branch: str, use_cache: bool = True) -> str:
+    sha = ls_remote_sha(owner, repo, branch)
+    if sha:
+        return sha
     token = os.environ.get("GITHUB_TOKEN")
-    headers = {"Accept": "application/vnd.github.v3+json"}
+    # The sha media type returns just the 40-hex commit SHA as text/plain
+    headers = {"Accept": "application/vnd.github.sha"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    resp = requests.get(
+    key = f"{owner}/{repo}@{branch}"
+    cache = load_etag_cache() if use_cache else {}
+    cached = cache.get(key)
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+    resp = SESSION.get(
         f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}",
         headers=headers, timeout=20
     )
+    if resp.status_code == 304 and cached:
+        return cached["sha"]
     if resp.status_code != 200:
         print(f"Error fetching HEAD commit: HTTP {resp.status_code}", file=sys.stderr)
         sys.exit(2)
-    return resp.json()["sha"]
+    # Decode explicitly: resp.text would guess the charset first
+    sha = resp.content.decode("utf-8", errors="replace").strip()
+    if not SHA_RE.fullmatch(sha):
+        print(f"Error: unexpected commit SHA from GitHub API: {sha[:80]!r}", file=sys.stderr)
+        sys.exit(2)
+    if use_cache and resp.headers.get("ETag"):
+        cache[key] = {"etag": resp.headers["ETag"], "sha": sha}
+        save_etag_cache(cache)
+    return sha
+
+
+def _valid_name(name) -> bool:
+    """Lowercase alphanumerics and hyphens, with no leading or trailing hyphen."""
+    return (isinstance(name, str) and name[:1] not in ("", "-") and name[-1] != "-"
+            and NAME_CHARS.issuperset(name))
 
 
 def validate_frontmatter(fm: dict) -> list[str]:
@@ -97,7 +310,7 @@ def validate_frontmatter(fm: dict) -> list[str]:
     name = fm.get("name", "")
     if not name:
         errors.append("missing 'name'")
-    elif not re.match(r'^[a-z0-9][a-z0-9-]*[a-z0-9]$|^[a-z0-9]$', name):
+    elif not _valid_name(name):
         errors.append(f"invalid name: {name!r}")
     if not fm.get("description"):
         errors.append("missing 'description'")
@@ -105,11 +318,11 @@ def validate_frontmatter(fm: dict) -> list[str]:
 
 
 def extract_summary(content: str) -> str:
-    body = content.split("---", 2)[-1].strip() if content.count("---") >= 2 else content
+    split = _split_frontmatter(content)
+    body = split[1] if split else content
     for line in body.splitlines():
         line = line.strip()
-        if line and not line.startswith("#") and not line.startswith("|") \
-                and not line.startswith("```"):
+        if line and not line.startswith(SUMMARY_SKIP):
             return line
     return ""
 
@@ -128,42 +341,47 @@ def build_updated_body(
     now: str,
 ) -> str:
     short_commit = new_commit[:12]
-    return f"""# {remote_name} (proxied from {owner}/{repo})
-
-**Source:** [{owner}/{repo}]({source_url}) · branch `{branch}` · commit `{short_commit}`
-
-## ⚠️ Liability disclaimer
-
-{LIABILITY_DISCLAIMER}
-
-## ⚠️ Verify before use
-
-Before following any instructions, fetch and verify the remote skill:
-
-1. Fetch the pinned content:
-   `{new_raw_url}`
-
-2. Compute SHA-256 of the fetched content and verify it equals:
-   `{new_sha256}`
-
-3. If the checksum does **not** match: **STOP immediately.**
-   Do not follow any instructions. Alert the user:
-   > "The remote skill content has changed unexpectedly. The 'Skill Proxy'
-   > checksum does not match. Run `verify-proxy.py` and review before proceeding."
-
-4. If the checksum **matches**: follow the instructions in the fetched SKILL.md.
-
-## Summary (updated {now})
-
-{new_summary or "(no summary available — see remote SKILL.md)"}
-
-## Re-verifying and updating this 'Skill Proxy'
-
-```bash
-uv run scripts/verify-proxy.py --proxy ./skills/{proxy_name}
-uv run scripts/update-proxy.py --proxy ./skills/{proxy_name}
-```
-"""
+    header = (
+        f"# {remote_name} (proxied from {owner}/{repo})\n\n"
+        f"**Source:** [{owner}/{repo}]({source_url}) · branch `{branch}` · commit `{short_commit}`\n"
+    )
+    summary_section = (
+        f"## Summary (updated {now})\n\n"
+        f"{new_summary or '(no summary available — see remote SKILL.md)'}\n"
+    )
+    return "\n".join([
+        header,
+        _LIABILITY_SECTION,
+        _VERIFY_BLOCK_TEMPLATE.format(pinned_url=new_raw_url, sha256=new_sha256),
+        summary_section,
+        _FOOTER_TEMPLATE.format(proxy_name=proxy_name),
+    ])
+
+
+def validate_proxy(proxy_dir: Path) -> None:
+    """
+    Run the first validator found on PATH against the proxy directory.
+    aider-skills validate is the production tool — try it first.
+    skills-ref is fallback only (its README marks it as demo/demonstration purposes only).
+    """
+    import subprocess
+
+    for tool, note in (("aider-skills", ""), ("skills-ref", " (fallback)")):
+        exe = shutil.which(tool)
+        if exe:
+            break
+    else:
+        LOG.line("  (neither aider-skills nor skills-ref found — skipping validation)")
+        LOG.line("  Install with: pip install aider-skills")
+        return
+    result = subprocess.run(
+        [exe, "validate", str(proxy_dir)],
+        capture_output=True, text=True, check=False, stdin=subprocess.DEVNULL,
+    )
+    if result.returncode == 0:
+        LOG.line(f"  ✓ 'Skill Proxy' passes {tool} validate{note}")
+    else:
+        LOG.line(f"  ⚠ {tool} validate output:\n{result.stdout}{result.stderr}")
 
 
 def main() -> int:
@@ -175,14 +393,17 @@ def main() -> int:
                         help="Path to the proxy skill directory")
     parser.add_argument("--dry-run", action="store_true",
                         help="Show what would change without writing")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Do not use the commits API ETag cache ({ETAG_CACHE_PATH})")
     args = parser.parse_args()
+    _import_deps()
 
     proxy_dir = Path(args.proxy)
-    print(f"Updating 'Skill Proxy': {proxy_dir}", file=sys.stderr)
-    print("⚠ Reminder: risk and responsibility for use lies with the user.",
-          file=sys.stderr)
+    LOG.line(f"Updating 'Skill Proxy': {proxy_dir}")
+    LOG.line("⚠ Reminder: risk and responsibility for use lies with the user.")
+    LOG.flush()
 
-    fm, _body = load_proxy_skill_md(proxy_dir)
+    fm = load_proxy_frontmatter(proxy_dir)
     meta = fm.get("metadata", {})
 
     source_url    = meta.get("proxy-source", "")
@@ -193,63 +414,61 @@ def main() -> int:
     created_by    = meta.get("proxy-created-by", "unknown")
 
     # Extract owner/repo from source URL
-    m = re.search(r'github\.com/([^/]+)/([^/]+)', source_url)
+    m = GH_OWNER_REPO_RE.search(source_url)
     if not m:
-        print(f"Error: cannot parse owner/repo from proxy-source: {source_url}",
-              file=sys.stderr)
+        LOG.line(f"Error: cannot parse owner/repo from proxy-source: {source_url}")
         sys.exit(1)
     owner, repo = m.group(1), m.group(2)
 
     # Derive skill_path from old pinned URL
-    raw_path_match = re.search(
-        r'raw\.githubusercontent\.com/[^/]+/[^/]+/[^/]+/(.+)',
-        old_raw_url
-    )
+    raw_path_match = RAW_PATH_RE.search(old_raw_url)
     remote_skill_path = raw_path_match.group(1) if raw_path_match else "SKILL.md"
 
     # Fetch HEAD commit
-    print(f"Fetching HEAD commit for {owner}/{repo}@{branch}...", file=sys.stderr)
-    new_commit = get_head_commit(owner, repo, branch)
+    LOG.line(f"Fetching HEAD commit for {owner}/{repo}@{branch}...")
+    LOG.flush()
+    new_commit = get_head_commit(owner, repo, branch, use_cache=not args.no_cache)
 
     if new_commit == old_commit:
-        print(f"  ✓ Already at HEAD ({new_commit[:12]}) — no update needed", file=sys.stderr)
+        LOG.line(f"  ✓ Already at HEAD ({new_commit[:12]}) — no update needed")
         return 0
 
-    print(f"  Old commit: {old_commit[:12]}", file=sys.stderr)
-    print(f"  New commit: {new_commit[:12]}", file=sys.stderr)
+    LOG.line(f"  Old commit: {old_commit[:12]}")
+    LOG.line(f"  New commit: {new_commit[:12]}")
 
     # Fetch new content
     new_raw_url = (
         f"https://raw.githubusercontent.com/{owner}/{repo}/{new_commit}/{remote_skill_path}"
     )
-    print("Fetching new content...", file=sys.stderr)
-    new_content = fetch_raw(new_raw_url)
+    LOG.line("Fetching new content...")
+    LOG.flush()
+    # Checksum the bytes as served; decode once for parsing
+    new_raw = fetch_raw(new_raw_url)
+    new_sha256 = hashlib.sha256(new_raw).hexdigest()
+    new_content = new_raw.decode("utf-8", errors="replace")
 
     # Validate
-    parts = new_content.split("---", 2)
-    remote_fm = yaml.safe_load(parts[1]) if len(parts) >= 2 else {}
+    split = _split_frontmatter(new_content)
+    remote_fm = (yaml.load(split[0], Loader=SafeLoader) if split else None) or {}
     errors = validate_frontmatter(remote_fm)
     if errors:
-        print("Error: updated remote skill failed validation:", file=sys.stderr)
+        LOG.line("Error: updated remote skill failed validation:")
         for e in errors:
-            print(f"  - {e}", file=sys.stderr)
-        print("'Skill Proxy' NOT updated. Review the upstream changes manually.",
-              file=sys.stderr)
+            LOG.line(f"  - {e}")
+        LOG.line("'Skill Proxy' NOT updated. Review the upstream changes manually.")
         sys.exit(3)
 
-    new_sha256  = hashlib.sha256(new_content.encode("utf-8")).hexdigest()
     new_summary = extract_summary(new_content)
-    now         = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M")
+    now         = time.strftime("%Y%m%d_%H%M", time.gmtime())
 
-    print(f"  New SHA-256: {new_sha256[:16]}...", file=sys.stderr)
+    LOG.line(f"  New SHA-256: {new_sha256[:16]}...")
 
     if args.dry_run:
-        print("\n[dry-run] Would update:", file=sys.stderr)
-        print(f"  proxy-commit     : {old_commit[:12]} → {new_commit[:12]}", file=sys.stderr)
-        print(f"  proxy-sha256     : {old_sha256[:16]}... → {new_sha256[:16]}...",
-              file=sys.stderr)
-        print(f"  proxy-raw-url    : → {new_raw_url}", file=sys.stderr)
-        print(f"  proxy-created-at : → {now} (updated)", file=sys.stderr)
+        LOG.line("\n[dry-run] Would update:")
+        LOG.line(f"  proxy-commit     : {old_commit[:12]} → {new_commit[:12]}")
+        LOG.line(f"  proxy-sha256     : {old_sha256[:16]}... → {new_sha256[:16]}...")
+        LOG.line(f"  proxy-raw-url    : → {new_raw_url}")
+        LOG.line(f"  proxy-created-at : → {now} (updated)")
         return 0
 
     # Update metadata
@@ -274,51 +493,22 @@ def main() -> int:
         now=now,
     )
 
-    fm_yaml = yaml.dump(fm, allow_unicode=True, sort_keys=False, width=120)
+    fm_yaml = yaml.dump(fm, Dumper=SafeDumper,
+                        allow_unicode=True, sort_keys=False, width=120)
     new_skill_md = f"---\n{fm_yaml}---\n\n{new_body}"
 
     skill_md_path = proxy_dir / "SKILL.md"
     skill_md_path.write_text(new_skill_md, encoding="utf-8")
-    print(f"  ✓ Written: {skill_md_path}", file=sys.stderr)
+    LOG.line(f"  ✓ Written: {skill_md_path}")
 
-    # Re-validate proxy.
-    # aider-skills validate is the production tool — try it first.
-    # skills-ref is fallback only (its README marks it as demo/demonstration purposes only).
-    validated = False
-    try:
-        result = subprocess.run(
-            ["aider-skills", "validate", str(proxy_dir)],
-            capture_output=True, text=True
-        )
-        if result.returncode == 0:
-            print("  ✓ 'Skill Proxy' passes aider-skills validate", file=sys.stderr)
-        else:
-            print(f"  ⚠ aider-skills validate output:\n{result.stdout}{result.stderr}",
-                  file=sys.stderr)
-        validated = True
-    except FileNotFoundError:
-        pass
-
-    if not validated:
-        try:
-            result = subprocess.run(
-                ["skills-ref", "validate", str(proxy_dir)],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                print("  ✓ 'Skill Proxy' passes skills-ref validate (fallback)", file=sys.stderr)
-            else:
-                print(f"  ⚠ skills-ref validate output:\n{result.stdout}{result.stderr}",
-                      file=sys.stderr)
-        except FileNotFoundError:
-            print("  (neither aider-skills nor skills-ref found — skipping validation)",
-                  file=sys.stderr)
-            print("  Install with: pip install aider-skills", file=sys.stderr)
-
-    print(f"\n✓ Updated 'Skill Proxy': {proxy_dir.name}", file=sys.stderr)
-    print(f"  Created by : {created_by}", file=sys.stderr)
-    print(f"  ⚠ Reminder : risk and responsibility for use lies with the user.",
-          file=sys.stderr)
+    # Re-validate proxy
+    LOG.flush()
+    validate_proxy(proxy_dir)
+
+    LOG.line(f"\n✓ Updated 'Skill Proxy': {proxy_dir.name}")
+    LOG.line(f"  Created by : {created_by}")
+    LOG.line(f"  ⚠ Reminder : risk and responsibility for use lies with the user.")
+    LOG.flush()
     print(json.dumps({"proxy": str(proxy_dir), "commit": new_commit, "sha256": new_sha256}))
     return 0
 
@@ -29,18 +29,115 @@ Exit codes:
 """
 
 import argparse
+import atexit
 import hashlib
+import json
 import os
 import re
 import sys
 from pathlib import Path
 
-try:
-    import requests
-    import yaml
-except ImportError:
-    print("Error: Run with: uv run scripts/verify-proxy.py", file=sys.stderr)
-    sys.exit(2)
+# Read size for streamed downloads that are hashed on the fly
+HASH_CHUNK_SIZE = 65536
+
+# Proxy frontmatter is read in chunks of this size up to its closing marker
+FRONTMATTER_READ_SIZE = 4096
+
+# Last commits API ETag and SHA per owner/repo@branch. A 304 revalidation
+# does not count against the GitHub rate limit.
+ETAG_CACHE_PATH = Path.home() / ".cache" / "skill-proxy" / "etags.json"
+
+# Owner and repo from a github.com URL
+GH_OWNER_REPO_RE = re.compile(r'github\.com/([^/]+)/([^/]+)')
+
+# A full 40-hex commit SHA
+SHA_RE = re.compile(r'[0-9a-f]{40}')
+
+
+class _Log:
+    """
+    Progress output for stderr, written in one call per flush() instead
+    of one write per line. main() flushes before each step that can block
+    or exit, so the output order is unchanged.
+    """
+
+    def __init__(self) -> None:
+        self.buf: list[str] = []
+
+    def line(self, s: str = "") -> None:
+        self.buf.append(s + "\n")
+
+    def flush(self) -> None:
+        if self.buf:
+            sys.stderr.write("".join(self.buf))
+            sys.stderr.flush()
+            self.buf.clear()
+
+
+LOG = _Log()
+# Also covers lines still buffered when sys.exit() is called
+atexit.register(LOG.flush)
+
+
+def create_session() -> "requests.Session":
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    session = requests.Session()
+    # requests already negotiates gzip; GitHub asks API clients to send a User-Agent
+    session.headers["User-Agent"] = "skill-proxy"
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+# requests and PyYAML, imported by _import_deps() once arguments are parsed
+requests = yaml = SafeLoader = SESSION = None
+
+
+def _import_deps() -> None:
+    """
+    Import requests and PyYAML and open the shared session. Deferred until
+    after argument parsing, so --help and usage errors return without
+    loading them.
+    """
+    global requests, yaml, SafeLoader, SESSION
+    try:
+        import requests
+        import yaml
+    except ImportError:
+        print("Error: Run with: uv run scripts/verify-proxy.py", file=sys.stderr)
+        sys.exit(2)
+    # Prefer the libyaml-backed C loader (bundled with PyYAML wheels)
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    # One session per run: keep-alive connections are reused across requests
+    SESSION = create_session()
+
+
+def _read_frontmatter(path: Path) -> str | None:
+    """
+    Read only the '---'-delimited frontmatter of a file, stopping at the
+    closing marker instead of loading the whole body.
+    Returns None if there is no frontmatter or it is not closed.
+    """
+    with path.open("rb") as f:
+        head = f.read(FRONTMATTER_READ_SIZE)
+        if not head.startswith(b"---"):
+            return None
+        end = head.find(b"\n---", 3)
+        while end == -1:
+            chunk = f.read(FRONTMATTER_READ_SIZE)
+            if not chunk:
+                return None
+            # Resume just before the old end in case the marker spans chunks
+            start = max(3, len(head) - 3)
+            head += chunk
+            end = head.find(b"\n---", start)
+    return head[3:end].decode("utf-8")
 
 
 def load_proxy_metadata(proxy_dir: Path) -> dict:
@@ -48,39 +145,101 @@ def load_proxy_metadata(proxy_dir: Path) -> dict:
     if not skill_md.exists():
         print(f"Error: no SKILL.md found in {proxy_dir}", file=sys.stderr)
         sys.exit(1)
-    content = skill_md.read_text(encoding="utf-8")
-    if not content.startswith("---"):
+    fm_text = _read_frontmatter(skill_md)
+    if fm_text is None:
         print("Error: SKILL.md has no frontmatter", file=sys.stderr)
         sys.exit(1)
-    end = content.find("---", 3)
-    fm = yaml.safe_load(content[3:end]) or {}
+    fm = yaml.load(fm_text, Loader=SafeLoader) or {}
     return fm.get("metadata", {})
 
 
-def fetch_pinned(url: str) -> str:
+def fetch_pinned_sha256(url: str) -> str:
+    """Stream the pinned content and return the SHA-256 of its raw bytes."""
+    digest = hashlib.sha256()
     try:
-        resp = requests.get(url, timeout=20)
+        with SESSION.get(url, timeout=20, stream=True) as resp:
+            if resp.status_code != 200:
+                print(f"Error: HTTP {resp.status_code} fetching {url}", file=sys.stderr)
+                sys.exit(2)
+            for chunk in resp.iter_content(HASH_CHUNK_SIZE):
+                digest.update(chunk)
     except requests.RequestException as e:
         print(f"Error fetching pinned URL: {e}", file=sys.stderr)
         sys.exit(2)
-    if resp.status_code != 200:
-        print(f"Error: HTTP {resp.status_code} fetching {url}", file=sys.stderr)
-        sys.exit(2)
-    return resp.text
+    return digest.hexdigest()
+
+
+def load_etag_cache() -> dict:
+    try:
+        return json.loads(ETAG_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
 
+def save_etag_cache(cache: dict) -> None:
+    """Write the cache atomically, so a concurrent run never reads a partial file."""
+    try:
+        ETAG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ETAG_CACHE_PATH.with_name(f"{ETAG_CACHE_PATH.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+        os.replace(tmp, ETAG_CACHE_PATH)
+    except OSError as e:
+        print(f"  (could not write ETag cache: {e})", file=sys.stderr)
+
+
+def ls_remote_sha(owner: str, repo: str, branch: str) -> str | None:
+    """
+    HEAD commit of branch via `git ls-remote`: one line of output and no API
+    quota. None if git is missing or the lookup fails, e.g. for a private
+    repo or a tag; the caller then falls back to the commits API.
+    """
+    import subprocess
 
-def get_latest_commit(owner: str, repo: str, branch: str) -> str | None:
+    ref = f"refs/heads/{branch}"
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", f"https://github.com/{owner}/{repo}.git", ref],
+            capture_output=True, text=True, timeout=15,
+            # Fail instead of prompting for credentials on private repos
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    for line in result.stdout.splitlines():
+        sha, _, name = line.partition("\t")
+        if name == ref and SHA_RE.fullmatch(sha):
+            return sha
+    return None
+
+
+def get_latest_commit(owner: str, repo: str, branch: str, use_cache: bool = True) -> str | None:
+    sha = ls_remote_sha(owner, repo, branch)
+    if sha:
+        return sha
     token = os.environ.get("GITHUB_TOKEN")
-    headers = {"Accept": "application/vnd.github.v3+json"}
+    # The sha media type returns just the 40-hex commit SHA as text/plain
+    headers = {"Accept": "application/vnd.github.sha"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    key = f"{owner}/{repo}@{branch}"
+    cache = load_etag_cache() if use_cache else {}
+    cached = cache.get(key)
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
     try:
-        resp = requests.get(
+        resp = SESSION.get(
             f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}",
             headers=headers, timeout=20
         )
-        if resp.status_code == 200:
-            return resp.json()["sha"]
+        if resp.status_code == 304 and cached:
+            return cached["sha"]
+        # Decode explicitly: resp.text would guess the charset first
+        sha = resp.content.decode("utf-8", errors="replace").strip()
+        if resp.status_code == 200 and SHA_RE.fullmatch(sha):
+            if use_cache and resp.headers.get("ETag"):
+                cache[key] = {"etag": resp.headers["ETag"], "sha": sha}
+                save_etag_cache(cache)
+            return sha
     except Exception:
         pass
     return None
@@ -93,12 +252,15 @@ def main() -> int:
     )
     parser.add_argument("--proxy", required=True,
                         help="Path to the proxy skill directory")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Do not use the commits API ETag cache ({ETAG_CACHE_PATH})")
     args = parser.parse_args()
+    _import_deps()
 
     proxy_dir = Path(args.proxy)
-    print(f"Verifying 'Skill Proxy': {proxy_dir}", file=sys.stderr)
-    print(f"⚠ Reminder: risk and responsibility for use lies with the user.",
-          file=sys.stderr)
+    LOG.line(f"Verifying 'Skill Proxy': {proxy_dir}")
+    LOG.line(f"⚠ Reminder: risk and responsibility for use lies with the user.")
+    LOG.flush()
 
     meta = load_proxy_metadata(proxy_dir)
 
@@ -111,47 +273,44 @@ def main() -> int:
     created_at    = meta.get("proxy-created-at", "unknown")
 
     if not pinned_url or not expected_sha:
-        print("Error: proxy metadata missing proxy-raw-url or proxy-sha256", file=sys.stderr)
+        LOG.line("Error: proxy metadata missing proxy-raw-url or proxy-sha256")
         sys.exit(1)
 
-    print(f"  Created by    : {created_by}", file=sys.stderr)
-    print(f"  Created at    : {created_at}", file=sys.stderr)
-    print(f"  Pinned commit : {pinned_commit[:12] if pinned_commit else 'unknown'}",
-          file=sys.stderr)
-    print(f"  Expected SHA  : {expected_sha[:16]}...", file=sys.stderr)
-
-    # Fetch pinned content
-    print("Fetching pinned URL...", file=sys.stderr)
-    content = fetch_pinned(pinned_url)
+    LOG.line(f"  Created by    : {created_by}")
+    LOG.line(f"  Created at    : {created_at}")
+    LOG.line(f"  Pinned commit : {pinned_commit[:12] if pinned_commit else 'unknown'}")
+    LOG.line(f"  Expected SHA  : {expected_sha[:16]}...")
 
-    # Verify checksum
-    actual_sha = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    # Fetch pinned content and verify checksum
+    LOG.line("Fetching pinned URL...")
+    LOG.flush()
+    actual_sha = fetch_pinned_sha256(pinned_url)
     if actual_sha == expected_sha:
-        print("  ✓ Checksum matches — 'Skill Proxy' is intact", file=sys.stderr)
+        LOG.line("  ✓ Checksum matches — 'Skill Proxy' is intact")
     else:
-        print("  ✗ CHECKSUM MISMATCH", file=sys.stderr)
-        print(f"    Expected : {expected_sha}", file=sys.stderr)
-        print(f"    Actual   : {actual_sha}", file=sys.stderr)
-        print("", file=sys.stderr)
-        print("The remote content at the pinned commit has changed.", file=sys.stderr)
-        print("This should not happen — GitHub commit content is immutable.", file=sys.stderr)
-        print("Something may be wrong with the 'Skill Proxy' metadata.", file=sys.stderr)
+        LOG.line("  ✗ CHECKSUM MISMATCH")
+        LOG.line(f"    Expected : {expected_sha}")
+        LOG.line(f"    Actual   : {actual_sha}")
+        LOG.line()
+        LOG.line("The remote content at the pinned commit has changed.")
+        LOG.line("This should not happen — GitHub commit content is immutable.")
+        LOG.line("Something may be wrong with the 'Skill Proxy' metadata.")
         sys.exit(4)
 
     # Check if upstream has newer commits
-    m = re.search(r'github\.com/([^/]+)/([^/]+)', source_url)
+    m = GH_OWNER_REPO_RE.search(source_url)
     if m:
         owner, repo = m.group(1), m.group(2)
-        print(f"Checking for upstream updates on branch '{branch}'...", file=sys.stderr)
-        latest = get_latest_commit(owner, repo, branch)
+        LOG.line(f"Checking for upstream updates on branch '{branch}'...")
+        LOG.flush()
+        latest = get_latest_commit(owner, repo, branch, use_cache=not args.no_cache)
         if latest and latest != pinned_commit:
-            print(f"  ℹ Upstream has a newer commit: {latest[:12]}", file=sys.stderr)
-            print("    Review upstream changes, then run update-proxy.py to update the pin.",
-                  file=sys.stderr)
+            LOG.line(f"  ℹ Upstream has a newer commit: {latest[:12]}")
+            LOG.line("    Review upstream changes, then run update-proxy.py to update the pin.")
         elif latest:
-            print(f"  ✓ 'Skill Proxy' is at HEAD of branch '{branch}'", file=sys.stderr)
+            LOG.line(f"  ✓ 'Skill Proxy' is at HEAD of branch '{branch}'")
 
-    print(f"\n✓ 'Skill Proxy' is intact: {proxy_dir.name}", file=sys.stderr)
+    LOG.line(f"\n✓ 'Skill Proxy' is intact: {proxy_dir.name}")
     return 0
 
 